@@ -10,16 +10,24 @@ spectral patterns required for offline development.
 from __future__ import annotations
 
 import argparse
+import ctypes
+import ctypes.util
+import functools
 import json
 import os
+import pickle
+import queue
 import socket
+import struct
 import sys
+import threading
 import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Tuple
 
 import numpy as np
 from scipy import signal
+from scipy.fft import next_fast_len, rfft
 
 try:  # pragma: no cover - exercised via branch logic in tests
     from brainflow import BoardIds, BoardShim, BrainFlowInputParams
@@ -28,6 +36,24 @@ except ImportError:  # pragma: no cover - used in CI where brainflow may be miss
     BoardShim = None  # type: ignore
     BrainFlowInputParams = object  # type: ignore
 
+try:  # pragma: no cover - optional JIT acceleration
+    from numba import njit
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - fall back to plain Python when numba is absent
+    HAVE_NUMBA = False
+
+    def njit(*args: Any, **_kwargs: Any) -> Any:
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:  # pragma: no cover - optional FFTW backend for the band-power FFT
+    import pyfftw
+    import pyfftw.builders
+except ImportError:  # pragma: no cover - scipy.fft is used when pyfftw is absent
+    pyfftw = None  # type: ignore
+
 # 使用绝对路径
 import yaml
 
@@ -36,6 +62,21 @@ CFG_MAP = os.path.join(BASE_DIR, "config", "channel_map.json")
 CFG_SET = os.path.join(BASE_DIR, "config", "settings.yaml")
 PROFILE_ENV_VAR = "BCI_FLYSTICK_PROFILE"
 CALIBRATION_ENV_VAR = "BCI_FLYSTICK_CALIBRATION"
+CONTROL_CHANNELS = ("C3", "C4", "Cz", "Oz")
+# 信号链路 (滤波 → 滑动窗口 → FFT) 全程使用单精度; EEG 的有效动态范围远小于 float32 精度.
+# 只有频段求和与控制计算使用 float64 标量
+SAMPLE_DTYPE = np.float32
+# FFTW 规划结果 (wisdom) 的缓存文件, 仅在安装 pyfftw 时使用
+FFTW_WISDOM_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bci_flystick", "fftw_wisdom.pkl")
+# UDP 负载字段固定, 直接按字节模板格式化, 省去逐 hop 的 dict 构造与 json 编码
+PAYLOAD_TEMPLATE = (
+    b'{"yaw": %.4f, "roll": %.4f, "altitude": %.4f, "pitch": %.4f, '
+    b'"throttle": %.4f, "speed": %.4f, "ts": %.6f}'
+)
+# --binary 模式的定长报文: 魔数 + yaw, altitude(roll), pitch, throttle, speed (float32) + ts (float64).
+# JSON 报文总以 "{" 开头, 接收端据魔数区分两种格式
+BINARY_MAGIC = b"BFS1"
+BINARY_PACKET = struct.Struct("<4s5fd")
 
 
 class ConfigError(RuntimeError):
@@ -122,6 +163,9 @@ def _validate_settings(raw: Dict[str, Any]) -> Dict[str, Any]:
         gains_clean[axis] = float(val)
     gains_clean["altitude"] = float(gains.get("altitude", gains_clean["roll"]))
 
+    band_power = raw.get("band_power", "fft")
+    _ensure(band_power in ("fft", "iir"), "band_power 必须为 fft 或 iir")
+
     udp_target = raw.get("udp_target")
     _ensure(isinstance(udp_target, (list, tuple)) and len(udp_target) == 2,
             "udp_target 必须为 [host, port]")
@@ -139,6 +183,7 @@ def _validate_settings(raw: Dict[str, Any]) -> Dict[str, Any]:
         "dead_band": dead_band,
         "gains": gains_clean,
         "calibration_sec": calibration_sec,
+        "band_power": band_power,
         "udp_target": (host, port)
     }
 
@@ -294,15 +339,8 @@ def _parse_target_entries(entries: Iterable[str], default_host: str) -> List[Tup
 
 
 def _deduplicate_targets(targets: Iterable[Tuple[str, int]]) -> List[Tuple[str, int]]:
-    seen: set[Tuple[str, int]] = set()
-    unique: List[Tuple[str, int]] = []
-    for host, port in targets:
-        key = (host, port)
-        if key in seen:
-            continue
-        unique.append(key)
-        seen.add(key)
-    return unique
+    # dict 保持插入顺序: 一次遍历即可按首次出现顺序去重
+    return list(dict.fromkeys((host, port) for host, port in targets))
 
 
 def _collect_udp_targets(primary: Tuple[str, int]) -> List[Tuple[str, int]]:
@@ -311,46 +349,225 @@ def _collect_udp_targets(primary: Tuple[str, int]) -> List[Tuple[str, int]]:
     return _deduplicate_targets([primary, *extras])
 
 
-class Ewma:
-    """指数加权移动平均滤波器"""
-    def __init__(self, a):
-        self.a, self.y = a, None
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IoVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_uint8 * 4),
+        ("sin_zero", ctypes.c_uint8 * 8),
+    ]
+
 
-    def step(self, x):
-        self.y = float(x) if self.y is None else self.a*float(x)+(1-self.a)*self.y
-        return self.y
+def _load_sendmmsg() -> Any:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        func = libc.sendmmsg
+    except (OSError, AttributeError):  # pragma: no cover - exotic libc
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    func.restype = ctypes.c_int
+    return func
+
+
+_SENDMMSG = _load_sendmmsg()
+
+
+class UdpFanout:
+    """把同一数据报发送到全部 UDP 目标.
+
+    单一目标时套接字直接 ``connect``, 之后用 ``send`` 省去每次的目标地址处理;
+    Linux 上多目标扇出通过一次 ``sendmmsg`` 系统调用完成 (目标地址预先解析并打包),
+    其他平台或地址无法按 IPv4 解析时退回逐个 ``sendto``。各路径都直接发送调用方的
+    ``bytes`` 缓冲区, 用户态不再复制. 套接字为非阻塞模式并放大发送缓冲, 缓冲仍然
+    已满时丢弃本帧而不是阻塞控制循环。
+    """
+
+    SNDBUF_BYTES = 256 * 1024
+
+    def __init__(self, sock: socket.socket, targets: Iterable[Tuple[str, int]]) -> None:
+        self.sock = sock
+        self.targets = list(targets)
+        self._msgs: Any = None
+        self._connected = False
+        sock.setblocking(False)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.SNDBUF_BYTES)
+        except OSError:  # pragma: no cover - platform dependent limit
+            pass
+        if len(self.targets) == 1:
+            try:
+                sock.connect(self.targets[0])
+                self._connected = True
+            except OSError:
+                pass
+            return
+        if _SENDMMSG is None:
+            return
+        try:
+            addrs = [(socket.gethostbyname(host), port) for host, port in self.targets]
+        except OSError:
+            return
+        count = len(addrs)
+        self._iov = _IoVec(None, 0)
+        self._names = (_SockAddrIn * count)()
+        self._msgs = (_MMsgHdr * count)()
+        for idx, (ip, port) in enumerate(addrs):
+            name = self._names[idx]
+            name.sin_family = socket.AF_INET
+            name.sin_port = socket.htons(port)
+            name.sin_addr[:] = list(socket.inet_aton(ip))
+            hdr = self._msgs[idx].msg_hdr
+            hdr.msg_name = ctypes.cast(ctypes.pointer(name), ctypes.c_void_p)
+            hdr.msg_namelen = ctypes.sizeof(_SockAddrIn)
+            hdr.msg_iov = ctypes.pointer(self._iov)
+            hdr.msg_iovlen = 1
+
+    def send(self, payload: bytes) -> None:
+        if self._connected:
+            try:
+                self.sock.send(payload)
+            except (BlockingIOError, ConnectionRefusedError):
+                # 缓冲已满或接收端尚未启动: 丢弃本帧, 下一 hop 会发送更新的数据
+                pass
+            except OSError as exc:
+                print(f"[WARN] Failed to send UDP packet to {self.targets[0]}: {exc}")
+            return
+        sent = 0
+        if self._msgs is not None:
+            # iovec 直接指向 bytes 对象内部的缓冲区; 调用期间 payload 保持引用, 地址有效
+            self._iov.iov_base = ctypes.cast(ctypes.c_char_p(payload), ctypes.c_void_p)
+            self._iov.iov_len = len(payload)
+            sent = max(0, _SENDMMSG(self.sock.fileno(), self._msgs, len(self._msgs), 0))
+        # sendmmsg 不可用或中途失败时, 剩余目标逐个发送以便报告具体错误
+        for target in self.targets[sent:]:
+            try:
+                self.sock.sendto(payload, target)
+            except BlockingIOError:
+                pass
+            except OSError as exc:
+                print(f"[WARN] Failed to send UDP packet to {target}: {exc}")
+
+
+@njit(cache=True, nogil=True)
+def _sos_stream(sos: np.ndarray, x: np.ndarray, zi: np.ndarray) -> None:  # pragma: no cover - numba
+    """原地对 ``(channels, samples)`` 逐节运行转置直接 II 型二阶节, 与 ``signal.sosfilt`` 等价.
+
+    ``zi`` 形状为 ``(sections, channels, 2)``, 调用后更新为末状态。不启用 fastmath,
+    以保证分块与整段滤波的结果逐位一致。
+    """
+
+    n_ch, n = x.shape
+    for c in range(n_ch):
+        for s in range(sos.shape[0]):
+            b0, b1, b2 = sos[s, 0], sos[s, 1], sos[s, 2]
+            a1, a2 = sos[s, 4], sos[s, 5]
+            z0, z1 = zi[s, c, 0], zi[s, c, 1]
+            for i in range(n):
+                xi = x[c, i]
+                y = b0 * xi + z0
+                z0 = b1 * xi - a1 * y + z1
+                z1 = b2 * xi - a2 * y
+                x[c, i] = y
+            zi[s, c, 0] = z0
+            zi[s, c, 1] = z1
 
 
 @dataclass(slots=True)
 class FilterPipeline:
-    """组合 notch + bandpass 滤波器，便于重复使用"""
+    """组合 notch + bandpass 滤波器，便于重复使用
+
+    实时控制只使用因果的 :meth:`stream` (每个样本只滤波一次, 状态跨 hop 保留);
+    :meth:`process` 为零相位双向滤波, 仅用于离线分析整段数据。
+    """
 
     fs: float
     notch: float
     bp_lo: float
     bp_hi: float
-    _notch: tuple[np.ndarray, np.ndarray] | None = field(init=False, default=None, repr=False)
-    _band: tuple[np.ndarray, np.ndarray] | None = field(init=False, default=None, repr=False)
+    _sos: np.ndarray | None = field(init=False, default=None, repr=False)
+    _padlen: int = field(init=False, default=0, repr=False)
+    _zi: np.ndarray | None = field(init=False, default=None, repr=False)
 
     def __post_init__(self) -> None:
         nyq = self.fs * 0.5
+        sections = []
         if 0 < self.notch < nyq:
             q = 30.0
             w0 = self.notch / nyq
-            self._notch = signal.iirnotch(w0, q)
+            sections.append(signal.tf2sos(*signal.iirnotch(w0, q)))
         if 0 < self.bp_lo < self.bp_hi < nyq:
-            self._band = signal.butter(4, [self.bp_lo / nyq, self.bp_hi / nyq], btype="band")
+            sections.append(
+                signal.butter(4, [self.bp_lo / nyq, self.bp_hi / nyq], btype="band", output="sos")
+            )
+        if sections:
+            # 两个线性滤波器串联为同一 SOS 级联, 每次滤波只遍历一次数据;
+            # 二阶节形式在单精度下依然稳定, 系数设计完成后转换为 SAMPLE_DTYPE
+            sos = np.vstack(sections)
+            self._sos = sos.astype(SAMPLE_DTYPE)
+            # 与 sosfiltfilt 默认的边缘填充长度一致; 输入较短时在 process 中相应缩短
+            ntaps = 2 * len(sos) + 1
+            ntaps -= min(int((sos[:, 2] == 0).sum()), int((sos[:, 5] == 0).sum()))
+            self._padlen = 3 * ntaps
 
     def process(self, sig: np.ndarray) -> np.ndarray:
-        data = np.asarray(sig, dtype=np.float64)
-        if data.size == 0:
+        """沿最后一个轴滤波; 支持单通道或 ``(channels, samples)`` 堆叠块 (一次调用处理全部通道)
+
+        输入先整理为 C 连续的 ``SAMPLE_DTYPE`` 数组, 转置或跨步切片得到的块也能按行连续访问。
+        """
+
+        data = np.ascontiguousarray(sig, dtype=SAMPLE_DTYPE)
+        n = data.shape[-1] if data.ndim else 0
+        if n < 2 or self._sos is None:
             return data
-        if self._notch is not None and data.size > max(len(self._notch[0]), len(self._notch[1])):
-            data = signal.filtfilt(*self._notch, data, method="gust")
-        if self._band is not None and data.size > max(len(self._band[0]), len(self._band[1])):
-            data = signal.filtfilt(*self._band, data, method="gust")
+        return signal.sosfiltfilt(self._sos, data, axis=-1, padlen=min(self._padlen, n - 1))
+
+    def stream(self, block: np.ndarray) -> np.ndarray:
+        """因果滤波新到达的 ``(channels, samples)`` 样本, 滤波器状态跨调用保留.
+
+        每个 hop 只处理新样本; 首次调用时按首个样本初始化为稳态, 避免直流偏置引起的启动瞬态。
+        """
+
+        data = np.asarray(block, dtype=SAMPLE_DTYPE)
+        if data.shape[-1] == 0 or self._sos is None:
+            return data
+        if self._zi is None:
+            zi = signal.sosfilt_zi(self._sos)[:, None, :] * data[None, :, :1]
+            self._zi = np.ascontiguousarray(zi, dtype=SAMPLE_DTYPE)
+        if HAVE_NUMBA and data.ndim == 2:
+            # hop 块只有几十个样本, sosfilt 的参数检查与分派开销远大于计算本身
+            out = np.array(data, dtype=SAMPLE_DTYPE, order="C")
+            _sos_stream(self._sos, out, self._zi)
+            return out
+        data, self._zi = signal.sosfilt(self._sos, data, axis=-1, zi=self._zi)
         return data
 
+    def reset(self) -> None:
+        """丢弃流式滤波状态"""
+
+        self._zi = None
+
 
 class MockBoard:
     """无需硬件的 EEG 数据模拟器."""
@@ -361,13 +578,31 @@ class MockBoard:
         self.channel_indices = {name: idx for idx, name in enumerate(self.channel_order)}
         self._t = 0.0
         self._rng = np.random.default_rng(42)
+        # 每个通道的 (直流, 幅值, 频率, 相位); 未列出的通道只含噪声
+        spec = {
+            "C3": (40e-6, 5e-6, 0.2, 0.0),
+            "C4": (40e-6, 5e-6, 0.21, 0.4),
+            "Cz": (35e-6, 6e-6, 0.18, 1.2),
+            "Oz": (30e-6, 7e-6, 0.16, 2.0),
+        }
+        params = np.array(
+            [spec.get(name, (0.0, 0.0, 0.0, 0.0)) for name in self.channel_order], dtype=np.float64
+        ).reshape(-1, 4)
+        self._dc = params[:, 0:1].copy()
+        self._amp = params[:, 1:2].copy()
+        self._omega = 2 * np.pi * params[:, 2]
+        self._phi = params[:, 3:4].copy()
         self._running = False
+        self._stream_start = time.monotonic()
+        self._emitted = 0
 
     def prepare_session(self) -> None:  # pragma: no cover - trivial
         self._t = 0.0
 
     def start_stream(self, _buffer_size: int | None = None) -> None:  # pragma: no cover - trivial
         self._running = True
+        self._stream_start = time.monotonic()
+        self._emitted = 0
 
     def stop_stream(self) -> None:  # pragma: no cover - trivial
         self._running = False
@@ -379,37 +614,358 @@ class MockBoard:
         samples = max(0, int(samples))
         t = self._t + np.arange(samples) / self.sample_rate
         self._t += samples / self.sample_rate
-        data = np.zeros((len(self.channel_order), samples), dtype=np.float64)
-
-        c3 = self.channel_indices.get("C3")
-        c4 = self.channel_indices.get("C4")
-        cz = self.channel_indices.get("Cz")
-        oz = self.channel_indices.get("Oz")
-        if c3 is not None:
-            data[c3, :] = 40e-6 + 5e-6 * np.sin(2 * np.pi * 0.2 * t)
-        if c4 is not None:
-            data[c4, :] = 40e-6 + 5e-6 * np.sin(2 * np.pi * 0.21 * t + 0.4)
-        if cz is not None:
-            data[cz, :] = 35e-6 + 6e-6 * np.sin(2 * np.pi * 0.18 * t + 1.2)
-        if oz is not None:
-            data[oz, :] = 30e-6 + 7e-6 * np.sin(2 * np.pi * 0.16 * t + 2.0)
-
-        noise = 1.2e-6 * self._rng.standard_normal(data.shape)
-        return data + noise
-
-
-def bandpower(sig: np.ndarray, fs: float, f1: float, f2: float) -> float:
-    """计算频段功率 (通过 Welch 谱)"""
-
-    if sig.size == 0:
-        return 0.0
-    nperseg = min(max(128, int(fs)), sig.size)
-    noverlap = int(nperseg * 0.5)
-    freqs, psd = signal.welch(sig, fs=fs, nperseg=nperseg, noverlap=noverlap, window="hann")
-    mask = (freqs >= f1) & (freqs <= f2)
-    if not np.any(mask):
-        return 0.0
-    return float(np.trapz(psd[mask], freqs[mask]))
+
+        # 所有通道一次外积求相位, 之后全部原地运算, 只分配信号和噪声两块数组
+        data = np.multiply.outer(self._omega, t)
+        data += self._phi
+        np.sin(data, out=data)
+        data *= self._amp
+        data += self._dc
+
+        noise = self._rng.standard_normal(data.shape)
+        noise *= 1.2e-6
+        data += noise
+        return data
+
+    def get_board_data_count(self) -> int:
+        """按实际流逝时间计算尚未读取的样本数 (模拟 BrainFlow 的环形缓冲)"""
+
+        produced = int((time.monotonic() - self._stream_start) * self.sample_rate)
+        return max(0, produced - self._emitted)
+
+    def get_board_data(self, num_samples: int | None = None) -> np.ndarray:
+        """取出自上次读取以来的新样本, 与 ``BoardShim.get_board_data`` 语义一致"""
+
+        samples = self.get_board_data_count()
+        if num_samples is not None:
+            samples = min(samples, max(0, int(num_samples)))
+        self._emitted += samples
+        return self.get_current_board_data(samples)
+
+
+class SlidingWindow:
+    """多通道固定长度滑动窗口.
+
+    数据在两倍长度的缓冲区中写两份, 因此 :meth:`view` 总能返回按时间顺序排列的
+    连续视图, 每个 hop 只需拷贝新到达的样本, 无需 ``np.roll``。
+    """
+
+    def __init__(self, n_channels: int, size: int, dtype: Any = SAMPLE_DTYPE) -> None:
+        self.size = int(size)
+        self._buf = np.zeros((n_channels, 2 * self.size), dtype=dtype)
+        self._pos = 0
+        self._filled = 0
+
+    @property
+    def full(self) -> bool:
+        return self._filled >= self.size
+
+    def extend(self, block: np.ndarray) -> None:
+        n = block.shape[-1]
+        if n == 0:
+            return
+        if n > self.size:
+            block = block[:, -self.size:]
+            n = self.size
+        size, pos = self.size, self._pos
+        first = min(n, size - pos)
+        self._buf[:, pos:pos + first] = block[:, :first]
+        self._buf[:, pos + size:pos + size + first] = block[:, :first]
+        rest = n - first
+        if rest:
+            self._buf[:, :rest] = block[:, first:]
+            self._buf[:, size:size + rest] = block[:, first:]
+        self._pos = (pos + n) % size
+        self._filled = min(size, self._filled + n)
+
+    def view(self) -> np.ndarray:
+        """返回最近 ``size`` 个样本 (最旧在前) 的视图"""
+
+        return self._buf[:, self._pos:self._pos + self.size]
+
+
+_fftw_wisdom_loaded = False
+
+
+def _load_fftw_wisdom() -> None:
+    """首次规划前导入磁盘上的 FFTW wisdom, 使 FFTW_MEASURE 规划几乎不耗时"""
+
+    global _fftw_wisdom_loaded
+    if _fftw_wisdom_loaded:
+        return
+    _fftw_wisdom_loaded = True
+    try:
+        with open(FFTW_WISDOM_PATH, "rb") as fh:
+            pyfftw.import_wisdom(pickle.load(fh))
+    except (OSError, pickle.UnpicklingError, EOFError, TypeError, ValueError):
+        pass
+
+
+def _save_fftw_wisdom() -> None:
+    try:
+        os.makedirs(os.path.dirname(FFTW_WISDOM_PATH), exist_ok=True)
+        with open(FFTW_WISDOM_PATH, "wb") as fh:
+            pickle.dump(pyfftw.export_wisdom(), fh)
+    except OSError as exc:  # pragma: no cover - depends on filesystem permissions
+        print(f"[WARN] Failed to save FFTW wisdom: {exc}")
+
+
+class RowGather:
+    """按预先确定的行索引从板卡数据块中取出控制通道.
+
+    一次 ``np.take`` 完成取行与 ``SAMPLE_DTYPE`` 转换, 结果写入可复用的扁平缓冲区
+    (其前缀 reshape 后总是 C 连续). 返回的数组在下一次调用时会被覆盖。
+    """
+
+    def __init__(self, rows: Iterable[int], capacity: int = 1024) -> None:
+        self.rows = np.asarray(list(rows), dtype=np.intp)
+        self._flat = np.empty(len(self.rows) * capacity, dtype=SAMPLE_DTYPE)
+
+    def __call__(self, data: np.ndarray) -> np.ndarray:
+        n_rows, n = len(self.rows), data.shape[1]
+        size = n_rows * n
+        if size > self._flat.size:
+            self._flat = np.empty(size, dtype=SAMPLE_DTYPE)
+        out = self._flat[:size].reshape(n_rows, n)
+        np.take(data, self.rows, axis=0, out=out)
+        return out
+
+
+@dataclass(slots=True)
+class BandPowerEstimator:
+    """Hann 窗 + 单次 rFFT 的频段功率估计器, 同一窗口的多个频段共享一次 FFT.
+
+    每种输入形状持有一个预先补零到快速长度的缓冲区, 加窗结果直接写入其中, 变换时不再
+    分配加窗与补零的临时数组. 安装 pyfftw 时该缓冲区属于预先生成的 FFTW 规划 (结果缓存为
+    wisdom); 否则使用 ``scipy.fft``。
+    """
+
+    fs: float
+    n_samples: int
+    _nfft: int = field(init=False, repr=False)
+    _window: np.ndarray = field(init=False, repr=False)
+    _scale: float = field(init=False, repr=False)
+    _df: float = field(init=False, repr=False)
+    _freqs: np.ndarray = field(init=False, repr=False)
+    _bins: Dict[Tuple[float, float], slice] = field(init=False, default_factory=dict, repr=False)
+    _weights: Dict[Tuple[Tuple[float, float], ...], np.ndarray] = field(
+        init=False, default_factory=dict, repr=False
+    )
+    _plans: Dict[Tuple[int, ...], Tuple[np.ndarray, Any, np.ndarray]] = field(
+        init=False, default_factory=dict, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self._window = signal.get_window("hann", self.n_samples).astype(SAMPLE_DTYPE)
+        # 与 Welch 的 density 缩放一致 (单边谱, 非 DC/Nyquist 频点乘 2)
+        self._scale = 2.0 / (self.fs * float(np.sum(self._window ** 2)))
+        # 补零到 pocketfft 的快速长度, 避免窗口长度含大素因子时退化
+        self._nfft = next_fast_len(self.n_samples, real=True)
+        self._df = self.fs / self._nfft
+        self._freqs = np.fft.rfftfreq(self._nfft, d=1.0 / self.fs)
+
+    def psd(self, sig: np.ndarray) -> np.ndarray:
+        """返回窗口 (单通道或 ``(channels, n_samples)`` 堆叠块) 的功率谱密度
+
+        多通道在一次 rFFT 调用中完成, 并由 pocketfft/FFTW 多线程处理各行。
+        返回的数组按输入形状复用, 下一次同形状调用会覆盖其内容。
+        """
+
+        entry = self._plans.get(sig.shape)
+        if entry is None:
+            entry = self._plans[sig.shape] = self._plan(sig.shape)
+        buf, transform, power = entry
+        np.multiply(sig, self._window, out=buf[..., : self.n_samples], casting="unsafe")
+        np.abs(transform(), out=power)
+        np.multiply(power, power, out=power)
+        power *= self._scale
+        return power
+
+    def band(self, psd: np.ndarray, f1: float, f2: float) -> np.ndarray:
+        """对 ``[f1, f2]`` 内的频点积分, 多通道时逐行返回 (频点区间首次使用时缓存)"""
+
+        return np.sum(psd[..., self._band_bins(f1, f2)], axis=-1, dtype=np.float64) * self._df
+
+    def bands(self, psd: np.ndarray, bands: Iterable[Tuple[float, float]]) -> np.ndarray:
+        """一次矩阵乘积分多个频段, 返回 ``(len(bands),) + psd.shape[:-1]`` 的 float64 数组
+
+        各频段的积分权重 (区间内频点为 ``df``, 其余为 0) 按频段组合缓存, 结果与逐个调用
+        :meth:`band` 一致。
+        """
+
+        key = tuple((float(f1), float(f2)) for f1, f2 in bands)
+        weights = self._weights.get(key)
+        if weights is None:
+            weights = np.zeros((len(key), self._freqs.size), dtype=SAMPLE_DTYPE)
+            for idx, (f1, f2) in enumerate(key):
+                weights[idx, self._band_bins(f1, f2)] = self._df
+            self._weights[key] = weights
+        return (weights @ psd.T).astype(np.float64)
+
+    def _band_bins(self, f1: float, f2: float) -> slice:
+        bins = self._bins.get((f1, f2))
+        if bins is None:
+            lo = int(np.searchsorted(self._freqs, f1, side="left"))
+            hi = int(np.searchsorted(self._freqs, f2, side="right"))
+            bins = self._bins[(f1, f2)] = slice(lo, hi)
+        return bins
+
+    def _plan(self, shape: Tuple[int, ...]) -> Tuple[np.ndarray, Any, np.ndarray]:
+        """为输入形状生成 ``(补零缓冲区, 变换函数, 功率谱输出)``; 补零段始终为 0, 每次只写入前 n_samples 个样本"""
+
+        padded = shape[:-1] + (self._nfft,)
+        power = np.empty(shape[:-1] + (self._nfft // 2 + 1,), dtype=SAMPLE_DTYPE)
+        if pyfftw is None:
+            buf = np.zeros(padded, dtype=SAMPLE_DTYPE)
+            return buf, functools.partial(rfft, buf, axis=-1, workers=-1), power
+        _load_fftw_wisdom()
+        plan = pyfftw.builders.rfft(
+            pyfftw.empty_aligned(padded, dtype=SAMPLE_DTYPE),
+            axis=-1,
+            threads=min(4, os.cpu_count() or 1),
+            planner_effort="FFTW_MEASURE",
+        )
+        # FFTW_MEASURE 规划时会覆写缓冲区, 规划完成后再清零
+        plan.input_array[...] = 0
+        _save_fftw_wisdom()
+        return plan.input_array, plan, power
+
+
+Bands = Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]]
+
+
+class WindowedBandPower:
+    """滑动窗口 + 单次 rFFT 的控制特征: 每个 hop 追加新样本后对整窗估计 μ/β/α 频段功率.
+
+    :meth:`update` 接收已滤波的 ``(C3, C4, Cz, Oz)`` 新样本块, 窗口未满时返回 ``None``,
+    否则返回 ``(mu, beta, oz_alpha)``; ``mu``/``beta`` 为逐通道数组。
+    """
+
+    def __init__(self, fs: float, n_samples: int, bands: Bands) -> None:
+        self.window = SlidingWindow(len(CONTROL_CHANNELS), n_samples, dtype=SAMPLE_DTYPE)
+        self.spectrum = BandPowerEstimator(fs, n_samples)
+        # 相同频段 (默认 μ 与 α 同为 8–12 Hz) 只积分一次
+        self._bands = list(dict.fromkeys(tuple(band) for band in bands))
+        self._index = [self._bands.index(tuple(band)) for band in bands]
+
+    def update(self, block: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float] | None:
+        self.window.extend(block)
+        if not self.window.full:
+            return None
+        # 所有通道 × 频段的功率由一次矩阵乘得到, 每行对应一个频段
+        powers = self.spectrum.bands(self.spectrum.psd(self.window.view()), self._bands)
+        i_mu, i_beta, i_alpha = self._index
+        return powers[i_mu], powers[i_beta], float(powers[i_alpha, 3])
+
+
+class IirBandPower:
+    """逐 hop 递推的频段功率: 各频段 Butterworth 带通 (滤波状态跨调用保留) → 均方 → 指数平均.
+
+    每个 hop 只处理新到达的样本, 代价与 hop 长度成正比, 不再对整窗做 FFT.
+    带通输出的均方即该频段的功率 (与 PSD 在频段内积分同量纲), 指数平均的时间常数取
+    ``tau`` 秒, 并按本次样本数折算, 因此不受 hop 长短影响. 接口与 :class:`WindowedBandPower` 相同。
+    """
+
+    def __init__(self, fs: float, n_channels: int, bands: Bands, tau: float) -> None:
+        # 相同频段 (默认 μ 与 α) 只滤波一次; 4 阶原型 (8 阶带通) 使相邻的 μ/β 频段间泄漏约 1-2%
+        unique = list(dict.fromkeys(tuple(band) for band in bands))
+        self._index = [unique.index(tuple(band)) for band in bands]
+        self._sos = [
+            signal.butter(4, band, btype="band", fs=fs, output="sos").astype(SAMPLE_DTYPE)
+            for band in unique
+        ]
+        self._zi = [np.zeros((sos.shape[0], n_channels, 2), dtype=SAMPLE_DTYPE) for sos in self._sos]
+        self._power = np.zeros((len(unique), n_channels), dtype=np.float64)
+        self._rate = 1.0 / (tau * fs)
+        self._primed = False
+
+    def update(self, block: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float] | None:
+        n = block.shape[-1]
+        if n == 0:
+            return None
+        gamma = 1.0 if not self._primed else -np.expm1(-n * self._rate)
+        for k, sos in enumerate(self._sos):
+            y, self._zi[k] = signal.sosfilt(sos, block, axis=-1, zi=self._zi[k])
+            mean_square = np.einsum("ij,ij->i", y, y, dtype=np.float64) / n
+            self._power[k] += gamma * (mean_square - self._power[k])
+        self._primed = True
+        i_mu, i_beta, i_alpha = self._index
+        # 返回副本: 结果会跨线程传递, 而 _power 在下一次调用时原地更新
+        return self._power[i_mu].copy(), self._power[i_beta].copy(), float(self._power[i_alpha, 3])
+
+
+class BandPowerWorker(threading.Thread):
+    """后台采集线程: 按 hop 取新样本 → 流式滤波 → 频段功率估计 (``features``).
+
+    BrainFlow 的数据拷贝与 scipy 的滤波/FFT 都会释放 GIL, 因此采集与谱估计可与
+    主线程的控制计算、UDP 发送并行. 每个 hop 向 ``out_queue`` 放入
+    ``(deadline, mu, beta, oz_alpha)``, 其中 ``deadline`` 为该 hop 的单调时钟调度时刻;
+    队列已满时丢弃最旧的一项, 主线程总是拿到最新结果.
+    ``hop_samples`` > 0 时, 到点后若板卡缓冲中的新样本不足一个 hop, 只再等待缺少的那部分时间.
+    线程内的异常会放入队列, 由主线程重新抛出.
+    """
+
+    def __init__(
+        self,
+        board: Any,
+        gather: RowGather,
+        filter_bank: FilterPipeline,
+        features: WindowedBandPower | IirBandPower,
+        hop: float,
+        out_queue: "queue.Queue[Any]",
+        hop_samples: int = 0,
+    ) -> None:
+        super().__init__(daemon=True)
+        self._board = board
+        self._gather = gather
+        self._filter_bank = filter_bank
+        self._features = features
+        self._hop = hop
+        self._queue = out_queue
+        self._hop_samples = max(0, int(hop_samples))
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _publish(self, item: Any) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(item)
+
+    def run(self) -> None:
+        # 按单调时钟的绝对截止时间调度, 睡眠误差不会逐 hop 累积
+        next_t = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                next_t += self._hop
+                dt = next_t - time.monotonic()
+                if dt > 0:
+                    if self._stop_event.wait(dt):
+                        break
+                elif dt < -self._hop:
+                    # 落后超过一个 hop (例如进程被挂起) 时重新对齐, 不补发积压的帧
+                    next_t = time.monotonic()
+                if self._hop_samples:
+                    missing = self._hop_samples - self._board.get_board_data_count()
+                    # 样本尚未到齐 (板卡时钟与本机存在偏差): 按缺口补等, 避免取到零散的短块
+                    if missing > 0 and self._stop_event.wait(missing * self._hop / self._hop_samples):
+                        break
+                data = self._board.get_board_data()
+                if data.shape[1] == 0:
+                    continue
+                # 新样本只滤波一次, 估计器内部保存的已是滤波结果或其状态
+                result = self._features.update(self._filter_bank.stream(self._gather(data)))
+                if result is not None:
+                    self._publish((next_t, *result))
+        except Exception as exc:  # pragma: no cover - surfaced to the main thread
+            self._publish(exc)
+
 
 def _parse_args(argv: list[str] | None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="BCI-Flystick controller")
@@ -417,6 +973,11 @@ def _parse_args(argv: list[str] | None) -> argparse.Namespace:
     parser.add_argument("--udp-host", help="覆盖配置中的 UDP 主机")
     parser.add_argument("--udp-port", type=int, help="覆盖配置中的 UDP 端口")
     parser.add_argument("--duration", type=float, help="运行指定秒数后自动退出 (测试使用)")
+    parser.add_argument(
+        "--binary",
+        action="store_true",
+        help="以定长二进制报文代替 JSON 发送 (接收端需支持, 如 feed_uinput)",
+    )
     return parser.parse_args(argv)
 
 
@@ -424,12 +985,51 @@ def clamp(value: float, lo: float = -1.0, hi: float = 1.0) -> float:
     return float(max(lo, min(hi, value)))
 
 
+def encode_payload(yaw: float, roll: float, pitch: float, throttle: float, ts: float) -> bytes:
+    """编码下游使用的 JSON 控制报文 (roll 同时以 altitude 发送, speed 由 throttle 推导)"""
+
+    return PAYLOAD_TEMPLATE % (yaw, roll, roll, pitch, throttle, (throttle + 1.0) * 0.5, ts)
+
+
+def encode_binary_payload(yaw: float, roll: float, pitch: float, throttle: float, ts: float) -> bytes:
+    """编码定长二进制控制报文 (见 ``BINARY_PACKET``), 字段与 JSON 报文一致"""
+
+    return BINARY_PACKET.pack(BINARY_MAGIC, yaw, roll, pitch, throttle, (throttle + 1.0) * 0.5, ts)
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _control_step(mu, beta, oz_alpha, baseline, state, alpha, gains, dead, out):  # pragma: no cover - JIT
+    """融合的每 hop 控制计算: 比值 → EWMA → 增益 → 限幅 → 死区.
+
+    ``mu``/``beta`` 按 C3, C4, Cz, Oz 排列; ``baseline`` 为 (Cz 总功率, Cz μ, Cz β, Oz α);
+    ``state`` 前 4 项为 yaw/roll/pitch/throttle 的 EWMA 状态, 第 5 项标记是否已初始化;
+    ``gains`` 已并入极性/反转/油门缩放. 结果写入 ``out`` 并返回.
+    编译后执行期间释放 GIL, 不阻塞后台采集线程。
+    """
+
+    p_left = mu[0] + beta[0]
+    p_right = mu[1] + beta[1]
+    out[0] = (p_right - p_left) / (p_right + p_left + 1e-9)
+    out[1] = (baseline[0] - (mu[2] + beta[2])) / (baseline[0] + 1e-9)
+    out[2] = (beta[2] - baseline[2]) / (baseline[2] + 1e-9) - (mu[2] - baseline[1]) / (baseline[1] + 1e-9)
+    out[3] = (baseline[3] - oz_alpha) / (baseline[3] + 1e-9)
+    # 首个 hop 以系数 1 直接用原始比值初始化; 循环体内无分支, 四个轴可整体向量化
+    a = alpha if state[4] > 0.0 else 1.0
+    for i in range(4):
+        state[i] = a * out[i] + (1.0 - a) * state[i]
+        value = min(1.0, max(-1.0, gains[i] * state[i]))
+        out[i] = value * (abs(value) >= dead)
+    state[4] = 1.0
+    return out
+
+
 def main(argv: list[str] | None = None) -> None:
     """主控制循环"""
 
     args = _parse_args(argv)
     board = None
     sock: socket.socket | None = None
+    worker: BandPowerWorker | None = None
 
     try:
         # ============ 1. 加载配置 ============
@@ -492,7 +1092,8 @@ def main(argv: list[str] | None = None) -> None:
 
         if use_mock:
             print("[INFO] Using mock EEG generator (offline mode)")
-            board = MockBoard(cfg["sample_rate"], [k for k in ("C3", "C4", "Cz", "Oz") if k in chs])
+            board = MockBoard(cfg["sample_rate"], [k for k in CONTROL_CHANNELS if k in chs])
+            board.start_stream()
             fs = cfg["sample_rate"]
             channel_indices = {name: board.channel_indices[name] for name in chs}
         else:
@@ -526,15 +1127,22 @@ def main(argv: list[str] | None = None) -> None:
             except IndexError as exc:
                 raise RuntimeError("channel_map.json 中的索引超出硬件 EEG 通道范围") from exc
 
-        required = {"C3", "C4", "Cz", "Oz"}
+        required = set(CONTROL_CHANNELS)
         missing = required.difference(channel_indices)
         if missing:
             raise RuntimeError(f"缺少必要通道映射: {', '.join(sorted(missing))}")
 
         filter_bank = FilterPipeline(fs, notch, bp_lo, bp_hi)
+        # 预热 (numba 可用时触发编译), 避免首个控制 hop 承担 JIT 延迟
+        _control_step(
+            np.ones(4), np.ones(4), 1.0, np.ones(4), np.zeros(5), alpha, np.ones(4), dead, np.zeros(4)
+        )
+        # 预先确定各通道所在行, 每个 hop 只需一次取行 + 一次批量滤波
+        gather = RowGather(channel_indices[name] for name in CONTROL_CHANNELS)
 
         # ============ 3. 初始化 UDP ============
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        fanout = UdpFanout(sock, udp_targets)
         if len(udp_targets) == 1:
             print(f"[INFO] UDP target: {udp_targets[0]}")
         else:
@@ -545,120 +1153,103 @@ def main(argv: list[str] | None = None) -> None:
         # ============ 4. 基线校准 ============
         print(f"[INFO] Calibrating baseline ({cfg['calibration_sec']}s)...")
         print("       Keep relaxed and look straight ahead...")
-        baseline_cz_total: list[float] = []
-        baseline_cz_mu: list[float] = []
-        baseline_cz_beta: list[float] = []
-        baseline_oz_alpha: list[float] = []
+        # 每 0.2s 至多采集一次, 按上限预分配, 避免逐次 append 与列表→数组转换;
+        # 各行依次为 Cz 总功率、Cz μ、Cz β、Oz α, 与控制内核的 baseline 顺序一致
+        max_iters = int(cfg["calibration_sec"] / 0.2) + 2
+        baseline_samples = np.empty((4, max_iters), dtype=np.float64)
+        n_baseline = 0
         start = time.time()
-        win_samp = int(win * fs)
+        # 频段功率估计器 (内部保存已滤波的窗口或递推状态), 校准与控制阶段共用,
+        # 保证基线与实时比值出自同一估计方法
+        if cfg["band_power"] == "iir":
+            features: WindowedBandPower | IirBandPower = IirBandPower(
+                fs, len(CONTROL_CHANNELS), (MU, BE, AL), win
+            )
+        else:
+            features = WindowedBandPower(fs, int(win * fs), (MU, BE, AL))
 
-        while time.time() - start < cfg["calibration_sec"]:
+        while time.time() - start < cfg["calibration_sec"] and n_baseline < max_iters:
             time.sleep(0.2)
-            data = board.get_current_board_data(win_samp)
-            if data.shape[1] < win_samp:
+            result = features.update(filter_bank.stream(gather(board.get_board_data())))
+            if result is None:
                 continue
 
-            cz = filter_bank.process(data[channel_indices["Cz"], :])
-            oz = filter_bank.process(data[channel_indices["Oz"], :])
-
-            cz_mu = bandpower(cz, fs, *MU)
-            cz_beta = bandpower(cz, fs, *BE)
-            baseline_cz_total.append(cz_mu + cz_beta)
-            baseline_cz_mu.append(cz_mu)
-            baseline_cz_beta.append(cz_beta)
-            baseline_oz_alpha.append(bandpower(oz, fs, *AL))
+            mu, beta, oz_alpha = result
+            cz_mu = mu[2]
+            cz_beta = beta[2]
+            baseline_samples[:, n_baseline] = (cz_mu + cz_beta, cz_mu, cz_beta, oz_alpha)
+            n_baseline += 1
 
             elapsed = int(time.time() - start)
             remaining = max(0, int(cfg["calibration_sec"] - elapsed))
             print(f"       {elapsed}s / {cfg['calibration_sec']}s ({remaining}s remaining)", end="\r")
 
-        B_CZ = float(np.median(baseline_cz_total) if baseline_cz_total else 1.0)
-        B_CZ_MU = float(np.median(baseline_cz_mu) if baseline_cz_mu else 1.0)
-        B_CZ_BE = float(np.median(baseline_cz_beta) if baseline_cz_beta else 1.0)
-        B_OZ = float(np.median(baseline_oz_alpha) if baseline_oz_alpha else 1.0)
+        if n_baseline:
+            baseline = np.median(baseline_samples[:, :n_baseline], axis=1)
+        else:
+            baseline = np.ones(4, dtype=np.float64)
+        B_CZ, B_CZ_MU, B_CZ_BE, B_OZ = baseline.tolist()
         print(f"\n[CAL] Baseline → Cz_total={B_CZ:.4f} μV², Cz_mu={B_CZ_MU:.4f} μV², Cz_beta={B_CZ_BE:.4f} μV², Oz_alpha={B_OZ:.4f} μV²")
 
         # ============ 5. 实时控制循环 ============
-        sYaw = Ewma(alpha)
-        sRoll = Ewma(alpha)
-        sThr = Ewma(alpha)
-        sPit = Ewma(alpha)
-        hop_samp = int(max(1, hop * fs))
+        # 极性、俯仰反转与油门缩放均为 ±1/正数因子, 可与增益合并后交给融合内核
+        axis_gains = np.array(
+            [
+                gains["yaw"] * axis_signs.get("yaw", 1.0),
+                gains["roll"] * axis_signs.get("roll", axis_signs.get("altitude", 1.0)),
+                gains["pitch"] * axis_signs.get("pitch", 1.0) * (-1.0 if invert_pitch else 1.0),
+                gains["throttle"] * throttle_scale * axis_signs.get("throttle", 1.0),
+            ],
+            dtype=np.float64,
+        )
+        ewma_state = np.zeros(5, dtype=np.float64)
+        axes_out = np.zeros(4, dtype=np.float64)
         print("[RUN] Streaming commands... (Press Ctrl+C to stop)")
         print("=" * 65)
-        t_loop = time.time()
+        # 主循环复用工作线程给出的 hop 截止时刻 (单调时钟), 换算一次墙钟偏移即可得到报文时间戳
+        t_loop = time.monotonic()
+        epoch_offset = time.time() - t_loop
+        # 采集与谱估计交给后台线程, 主线程只负责控制计算、发送与打印
+        encode = encode_binary_payload if args.binary else encode_payload
+        results: "queue.Queue[Any]" = queue.Queue(maxsize=2)
+        worker = BandPowerWorker(
+            board, gather, filter_bank, features, hop, results, hop_samples=int(hop * fs)
+        )
+        worker.start()
+        # 状态行限制在约 2 Hz 刷新, 高 hop 速率下不必每帧格式化并写终端
+        status_every = max(1, int(0.5 / hop))
+        hop_count = 0
+        # 输出持续为零 (用户静止) 时只按约 1 Hz 发送心跳帧, 不必每 hop 重复同一报文
+        heartbeat_every = max(1, int(1.0 / hop))
+        idle_hops = 0
 
         while True:
-            time.sleep(hop * 0.5)
-            data = board.get_current_board_data(win_samp)
-            if data.shape[1] < win_samp:
-                continue
-
-            c3 = filter_bank.process(data[channel_indices["C3"], :])
-            c4 = filter_bank.process(data[channel_indices["C4"], :])
-            cz = filter_bank.process(data[channel_indices["Cz"], :])
-            oz = filter_bank.process(data[channel_indices["Oz"], :])
-
-            pL_mu = bandpower(c3, fs, *MU)
-            pL_be = bandpower(c3, fs, *BE)
-            pR_mu = bandpower(c4, fs, *MU)
-            pR_be = bandpower(c4, fs, *BE)
-            pL = pL_mu + pL_be
-            pR = pR_mu + pR_be
-            li = (pR - pL) / (pR + pL + 1e-9)
-            yaw = clamp(gains["yaw"] * sYaw.step(li))
-
-            cz_mu = bandpower(cz, fs, *MU)
-            cz_beta = bandpower(cz, fs, *BE)
-            cz_total = cz_mu + cz_beta
-            erd = (B_CZ - cz_total) / (B_CZ + 1e-9)
-            roll = clamp(gains["roll"] * sRoll.step(erd))
-
-            pitch_raw = (cz_beta - B_CZ_BE) / (B_CZ_BE + 1e-9) - (cz_mu - B_CZ_MU) / (B_CZ_MU + 1e-9)
-            pitch_value = gains["pitch"] * sPit.step(pitch_raw)
-            if invert_pitch:
-                pitch_value *= -1.0
-            pitch = clamp(pitch_value) * axis_signs.get("pitch", 1.0)
-
-            oz_alpha = bandpower(oz, fs, *AL)
-            thr_raw = (B_OZ - oz_alpha) / (B_OZ + 1e-9)
-            throttle_value = gains["throttle"] * sThr.step(thr_raw) * throttle_scale
-            throttle = clamp(throttle_value) * axis_signs.get("throttle", 1.0)
-
-            if abs(yaw) < dead:
-                yaw = 0.0
-            if abs(roll) < dead:
-                roll = 0.0
-            if abs(pitch) < dead:
-                pitch = 0.0
-            if abs(throttle) < dead:
-                throttle = 0.0
-
-            yaw *= axis_signs.get("yaw", 1.0)
-            roll *= axis_signs.get("roll", axis_signs.get("altitude", 1.0))
-
-            msg = {
-                "yaw": round(yaw, 4),
-                "roll": round(roll, 4),
-                "altitude": round(roll, 4),
-                "pitch": round(pitch, 4),
-                "throttle": round(throttle, 4),
-                "speed": round((throttle + 1.0) * 0.5, 4),
-                "ts": time.time(),
-            }
-            encoded = json.dumps(msg).encode("utf-8")
-            for target in udp_targets:
-                try:
-                    sock.sendto(encoded, target)
-                except OSError as exc:
-                    print(f"[WARN] Failed to send UDP packet to {target}: {exc}")
-
-            print(
-                f"Yaw={yaw:+.2f} | Roll={roll:+.2f} | Pitch={pitch:+.2f} | Throttle={throttle:+.2f}",
-                end="\r",
-            )
-
-            if args.duration and time.time() - t_loop >= args.duration:
+            try:
+                item = results.get(timeout=max(0.5, 4 * hop))
+            except queue.Empty:
+                item = None
+            if isinstance(item, BaseException):
+                raise item
+            if item is None:
+                now = time.monotonic()
+            else:
+                now, mu, beta, oz_alpha = item
+                _control_step(mu, beta, oz_alpha, baseline, ewma_state, alpha, axis_gains, dead, axes_out)
+                yaw, roll, pitch, throttle = axes_out.tolist()
+
+                idle_hops = idle_hops + 1 if not axes_out.any() else 0
+                # 首个零帧照常发送, 保证接收端归零
+                if idle_hops == 0 or (idle_hops - 1) % heartbeat_every == 0:
+                    fanout.send(encode(yaw, roll, pitch, throttle, now + epoch_offset))
+
+                hop_count += 1
+                if hop_count % status_every == 0:
+                    sys.stdout.write(
+                        f"Yaw={yaw:+.2f} | Roll={roll:+.2f} | Pitch={pitch:+.2f} | Throttle={throttle:+.2f}\r"
+                    )
+                    sys.stdout.flush()
+
+            if args.duration and now - t_loop >= args.duration:
                 print("\n[INFO] Duration reached, stopping...")
                 break
 
@@ -675,6 +1266,9 @@ def main(argv: list[str] | None = None) -> None:
 
     finally:
         print("[CLEANUP] Releasing resources...")
+        if worker is not None:
+            worker.stop()
+            worker.join(timeout=2.0)
         if board is not None:
             for name in ("stop_stream", "release_session"):
                 meth = getattr(board, name, None)
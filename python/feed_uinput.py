@@ -2,15 +2,33 @@
 from __future__ import annotations
 
 import argparse
+import ctypes
+import ctypes.util
+import errno
 import json
+import math
+import os
+import selectors
 import socket
+import struct
 import sys
+from typing import Any
 
 try:
     import uinput  # type: ignore
 except ImportError:  # pragma: no cover - tested via branch logic
     uinput = None
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms have no uinput anyway
+    fcntl = None  # type: ignore
+
+try:  # pragma: no cover - optional faster JSON decoder
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json is used when orjson is absent
+    orjson = None
+
 
 def _require_uinput() -> None:
     if uinput is None:
@@ -18,8 +36,37 @@ def _require_uinput() -> None:
         print("Install with: pip install python-uinput")
         sys.exit(1)
 
+if orjson is not None:
+    # orjson 直接解析 bytes/memoryview, 省去先解码为 str 的一次拷贝
+    _loads = orjson.loads
+else:  # pragma: no cover - depends on the environment
+    _decode = json.JSONDecoder().decode
+
+    def _loads(data: bytes | memoryview) -> Any:
+        # 报文固定为 UTF-8: 直接把视图解码为 str 再用预先绑定的解码器解析, 省去 bytes 拷贝与编码探测
+        return _decode(str(data, "utf-8"))
+
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 5005
+# 接收缓冲足以容纳突发报文; 每次唤醒都会读空, 只处理最新一帧
+RCVBUF_BYTES = 256 * 1024
+# linux/input-event-codes.h 与 linux/uinput.h 中用到的常量
+EV_SYN, EV_ABS, SYN_REPORT = 0x00, 0x03, 0
+ABS_X, ABS_Y, ABS_Z, ABS_RX = 0x00, 0x01, 0x02, 0x03
+BUS_USB = 0x03
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+UI_DEV_SETUP = 0x405C5503
+UI_ABS_SETUP = 0x401C5504
+UI_SET_EVBIT = 0x40045564
+UI_SET_ABSBIT = 0x40045567
+# struct input_event (timeval 由内核填写), uinput_setup, uinput_abs_setup
+INPUT_EVENT = struct.Struct("@llHHi")
+_UINPUT_SETUP = struct.Struct("@4H80sI")
+_UINPUT_ABS_SETUP = struct.Struct("@H2x6i")
+# bci_controller --binary 的定长报文: 魔数 + yaw, altitude, pitch, throttle, speed (float32) + ts (float64)
+BINARY_MAGIC = b"BFS1"
+BINARY_PACKET = struct.Struct("<4s5fd")
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -29,14 +76,249 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     return parser.parse_args(argv)
 
 def m01(x):
-    return int(max(0, min(1, x)) * 65535)
+    # 先缩放再用比较限幅, 省去 max/min 两次内建调用; 结果与先限幅后缩放一致
+    v = x * 65535.0
+    if v >= 65535.0:
+        return 65535
+    return int(v) if v > 0.0 else 0
 
 def m11(x):
-    return int((max(-1, min(1, x)) + 1) * 0.5 * 65535)
+    v = (x + 1.0) * 32767.5
+    if v >= 65535.0:
+        return 65535
+    return int(v) if v > 0.0 else 0
+
+def decode_command(data: bytes | memoryview) -> tuple[float, float, float, float] | None:
+    """解析一帧控制报文 (二进制或 JSON), 返回 ``(roll, throttle, pitch, yaw)``; 无法识别时返回 None
+
+    二进制报文直接从 ``data`` (可为接收缓冲区的 memoryview) 解包, 不产生拷贝。
+    """
+
+    if data[:4] == BINARY_MAGIC:
+        if len(data) != BINARY_PACKET.size:
+            return None
+        _, yaw, roll, pitch, throttle, _speed, _ts = BINARY_PACKET.unpack_from(data)
+        return (roll, throttle, pitch, yaw) if math.isfinite(roll + throttle + pitch + yaw) else None
+    try:
+        m = _loads(data)
+    except ValueError:  # JSONDecodeError / UnicodeDecodeError / orjson.JSONDecodeError
+        return None
+    if not isinstance(m, dict) or ("yaw" not in m and "rudder" not in m):
+        return None
+    throttle = m.get("throttle")
+    if throttle is None:
+        throttle = 2 * float(m.get("speed", 0.0)) - 1.0
+    roll = float(m.get("roll", m.get("altitude", 0.0)))
+    pitch = float(m.get("pitch", m.get("z", 0.0)))
+    yaw = float(m.get("yaw", m.get("rx", m.get("rudder", 0.0))))
+    throttle = float(throttle)
+    # NaN/Inf (stdlib json 接受 NaN 字面量) 无法映射到轴值, 整帧丢弃
+    return (roll, throttle, pitch, yaw) if math.isfinite(roll + throttle + pitch + yaw) else None
+
+def drain_latest(sock: socket.socket, view: memoryview) -> int | None:
+    """读空非阻塞套接字的接收队列, 只保留最新一帧 (留在 ``view`` 中)
+
+    返回最新一帧的长度, 队列为空时返回 None. 积压的旧指令直接丢弃, 虚拟摇杆总是反映当前状态。
+    """
+
+    size = None
+    while True:
+        try:
+            size = sock.recv_into(view)
+        except BlockingIOError:
+            return size
+
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IoVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+def _load_recvmmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        func = libc.recvmmsg
+    except (OSError, AttributeError):  # pragma: no cover - exotic libc
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    func.restype = ctypes.c_int
+    return func
+
+_RECVMMSG = _load_recvmmsg()
+
+class LatestDatagram:
+    """批量读空接收队列, 返回最新一帧的 memoryview (队列为空时返回 None)
+
+    Linux 上每次 ``recvmmsg`` 系统调用最多取 ``batch`` 帧到预分配的槽位中, 积压的旧帧
+    只需一次内核切换即可丢弃; 其他平台退回逐帧 :func:`drain_latest`。返回的视图在下次调用时被覆盖。
+    """
+
+    def __init__(self, sock: socket.socket, batch: int = 16, size: int = 2048) -> None:
+        self.sock = sock
+        self.size = size
+        self._batch = batch if _RECVMMSG is not None else 1
+        self._buf = bytearray(self._batch * size)
+        self._view = memoryview(self._buf)
+        self._msgs = None
+        if _RECVMMSG is None:
+            return
+        base = ctypes.addressof((ctypes.c_char * len(self._buf)).from_buffer(self._buf))
+        self._iovs = (_IoVec * batch)()
+        self._msgs = (_MMsgHdr * batch)()
+        for idx in range(batch):
+            self._iovs[idx].iov_base = base + idx * size
+            self._iovs[idx].iov_len = size
+            hdr = self._msgs[idx].msg_hdr
+            hdr.msg_iov = ctypes.pointer(self._iovs[idx])
+            hdr.msg_iovlen = 1
+
+    def __call__(self) -> memoryview | None:
+        if self._msgs is None:
+            n = drain_latest(self.sock, self._view)
+            return None if n is None else self._view[:n]
+        latest = None
+        fd = self.sock.fileno()
+        while True:
+            count = _RECVMMSG(fd, self._msgs, self._batch, socket.MSG_DONTWAIT, None)
+            if count < 0:
+                err = ctypes.get_errno()
+                if err == errno.EINTR:
+                    continue
+                if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return latest
+                raise OSError(err, os.strerror(err))
+            if count == 0:
+                return latest
+            start = (count - 1) * self.size
+            latest = self._view[start:start + self._msgs[count - 1].msg_len]
+            if count < self._batch:
+                return latest
+
+def emit_changed(dev, codes, values, last) -> bool:
+    """只写入与上次不同的轴, 有变化时以一次 SYN_REPORT 提交; ``last`` 原地更新"""
+
+    changed = False
+    emit = dev.emit
+    for idx, value in enumerate(values):
+        if value != last[idx]:
+            emit(codes[idx], value, syn=False)
+            last[idx] = value
+            changed = True
+    if changed:
+        dev.syn()
+    return changed
+
+class RawJoystick:
+    """不经 python-uinput, 直接通过 ``/dev/uinput`` 的 ioctl 创建的四轴虚拟摇杆.
+
+    变化的轴事件与 SYN_REPORT 打包进预分配缓冲区, 每帧只需一次 ``os.write`` 系统调用。
+    """
+
+    def __init__(self, fd: int, codes: tuple[int, ...] = (ABS_X, ABS_Y, ABS_Z, ABS_RX)) -> None:
+        self.fd = fd
+        self.codes = codes
+        self._buf = bytearray(INPUT_EVENT.size * (len(codes) + 1))
+        self._view = memoryview(self._buf)
+
+    @classmethod
+    def create(
+        cls,
+        name: str = "BCI-Flystick",
+        codes: tuple[int, ...] = (ABS_X, ABS_Y, ABS_Z, ABS_RX),
+        path: str = "/dev/uinput",
+    ) -> "RawJoystick":
+        if fcntl is None:
+            raise OSError(errno.ENOSYS, "uinput is only available on Linux")
+        fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            fcntl.ioctl(fd, UI_SET_EVBIT, EV_ABS)
+            for code in codes:
+                fcntl.ioctl(fd, UI_SET_ABSBIT, code)
+                fcntl.ioctl(fd, UI_ABS_SETUP, _UINPUT_ABS_SETUP.pack(code, 0, 0, 65535, 0, 0, 0))
+            fcntl.ioctl(fd, UI_DEV_SETUP, _UINPUT_SETUP.pack(BUS_USB, 1, 1, 1, name.encode()[:79], 0))
+            fcntl.ioctl(fd, UI_DEV_CREATE)
+        except BaseException:
+            os.close(fd)
+            raise
+        return cls(fd, codes)
+
+    def write(self, values, last) -> bool:
+        """与 :func:`emit_changed` 相同: 只写变化的轴, 有变化时连同 SYN_REPORT 一次写入"""
+
+        size = INPUT_EVENT.size
+        offset = 0
+        for idx, value in enumerate(values):
+            if value != last[idx]:
+                INPUT_EVENT.pack_into(self._buf, offset, 0, 0, EV_ABS, self.codes[idx], value)
+                offset += size
+                last[idx] = value
+        if not offset:
+            return False
+        INPUT_EVENT.pack_into(self._buf, offset, 0, 0, EV_SYN, SYN_REPORT, 0)
+        os.write(self.fd, self._view[: offset + size])
+        return True
+
+    def close(self) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+        except OSError:
+            pass
+        finally:
+            os.close(self.fd)
+
+    def __enter__(self) -> "RawJoystick":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+class _LibJoystick:
+    """python-uinput 后备实现, 接口与 :class:`RawJoystick` 相同"""
+
+    def __init__(self) -> None:
+        self.codes = (uinput.ABS_X, uinput.ABS_Y, uinput.ABS_Z, uinput.ABS_RX)
+        self._dev = uinput.Device([code + (0, 65535, 0, 0) for code in self.codes], name="BCI-Flystick")
+
+    def write(self, values, last) -> bool:
+        return emit_changed(self._dev, self.codes, values, last)
+
+    def __enter__(self) -> "_LibJoystick":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self._dev.destroy()
+
+def open_joystick() -> RawJoystick | _LibJoystick:
+    """优先直接驱动 ``/dev/uinput``; 除权限不足外的失败 (如内核过旧) 退回 python-uinput"""
+
+    try:
+        return RawJoystick.create()
+    except PermissionError:
+        raise
+    except OSError as exc:
+        print(f"[WARN] Direct /dev/uinput setup failed ({exc}), trying python-uinput")
+        _require_uinput()
+        return _LibJoystick()
 
 def main(argv: list[str] | None = None) -> None:
     args = parse_args(argv)
-    _require_uinput()
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
@@ -49,47 +331,44 @@ def main(argv: list[str] | None = None) -> None:
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         except OSError:
             pass
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF_BYTES)
+    except OSError:  # pragma: no cover - platform dependent limit
+        pass
     try:
         sock.bind((args.host, args.port))
         print(f"[OK] Listening on {(args.host, args.port)}")
     except OSError as e:
         print(f"[ERROR] Failed to bind: {e}")
         sys.exit(1)
-
-    axes = [
-        uinput.ABS_X + (0, 65535, 0, 0),
-        uinput.ABS_Y + (0, 65535, 0, 0),
-        uinput.ABS_Z + (0, 65535, 0, 0),
-        uinput.ABS_RX + (0, 65535, 0, 0),
-    ]
+    print(f"[OK] UDP receive buffer: {sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)} bytes")
+    sock.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
 
     try:
-        with uinput.Device(axes, name="BCI-Flystick") as dev:
+        with open_joystick() as joystick:
             print("[OK] Virtual joystick created")
+            last = [-1, -1, -1, -1]
+            # 预分配接收槽位, 二进制报文在稳态下不产生逐包分配
+            receive = LatestDatagram(sock)
             while True:
-                try:
-                    data, _ = sock.recvfrom(2048)
-                    m = json.loads(data.decode())
-                    if "yaw" not in m and "rudder" not in m:
-                        continue
-                    throttle = m.get("throttle")
-                    if throttle is None:
-                        throttle = 2 * float(m.get("speed", 0.0)) - 1.0
-                    roll = float(m.get("roll", m.get("altitude", 0.0)))
-                    pitch = float(m.get("pitch", m.get("z", 0.0)))
-                    yaw = float(m.get("yaw", m.get("rx", m.get("rudder", 0.0))))
-                    dev.emit(uinput.ABS_X, m11(roll), syn=False)
-                    dev.emit(uinput.ABS_Y, m11(throttle), syn=False)
-                    dev.emit(uinput.ABS_Z, m11(pitch), syn=False)
-                    dev.emit(uinput.ABS_RX, m11(yaw), syn=True)
-                except json.JSONDecodeError:
+                selector.select()
+                data = receive()
+                if data is None:
+                    continue
+                command = decode_command(data)
+                if command is None:
                     continue
+                roll, throttle, pitch, yaw = command
+                joystick.write((m11(roll), m11(throttle), m11(pitch), m11(yaw)), last)
     except PermissionError:
         print("[ERROR] Run with: sudo python python/feed_uinput.py")
         sys.exit(1)
     except KeyboardInterrupt:
         print("\n[STOP]")
     finally:
+        selector.close()
         sock.close()
 
 if __name__ == "__main__":
@@ -3,17 +3,33 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
+import selectors
 import socket
+import struct
 import sys
 import time
 from collections.abc import Mapping
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Callable, Optional, Tuple
 
 try:
     import pyvjoy  # type: ignore
 except ImportError:  # pragma: no cover - tested via branch logic
     pyvjoy = None
 
+try:  # pragma: no cover - optional JIT acceleration
+    from numba import njit
+except ImportError:  # pragma: no cover - fall back to plain Python when numba is absent
+    def njit(*args: Any, **_kwargs: Any) -> Any:
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:  # pragma: no cover - optional faster JSON decoder
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json is used when orjson is absent
+    orjson = None
+
 try:  # pragma: no cover - optional dependency guard
     from pyvjoy._sdk import RelinquishVJD  # type: ignore
 except Exception:  # pragma: no cover - only triggered when pyvjoy absent
@@ -23,6 +39,33 @@ DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 5005
 AXIS_MAX = 32767
 AXIS_ORDER = ("throttle", "roll", "pitch", "yaw")
+# Axes travel through the loop as 4-tuples in ``AXIS_ORDER``; these index them.
+THROTTLE, ROLL, PITCH, YAW = range(4)
+# Receive buffer sized to absorb bursts while the loop is busy in the driver.
+RCVBUF_BYTES = 256 * 1024
+# The rate report is checked every 4th handled frame (~0.2-0.4 s at typical
+# controller rates), not on every packet.
+REPORT_CHECK_MASK = 0x3
+_HALF_SCALE = AXIS_MAX * 0.5
+# Centred stick (``normalize(0.0)``), used for axes missing from a payload.
+NEUTRAL = int(_HALF_SCALE + 0.5)
+NEUTRAL_AXES = (NEUTRAL,) * len(AXIS_ORDER)
+# Fixed-size frames sent by ``bci_controller --binary``: magic, then yaw,
+# altitude (roll), pitch, throttle, speed as float32 and a float64 timestamp.
+BINARY_MAGIC = b"BFS1"
+BINARY_PACKET = struct.Struct("<4s5fd")
+
+if orjson is not None:
+    # orjson parses the receive buffer (a memoryview) directly, without an
+    # intermediate ``bytes``/``str`` copy.
+    _loads = orjson.loads
+else:  # pragma: no cover - depends on the environment
+    _decode = json.JSONDecoder().decode
+
+    def _loads(data: bytes | memoryview) -> Any:
+        # The protocol is UTF-8: decode the view straight to ``str`` (no bytes
+        # copy, no encoding sniffing) and parse with a pre-bound decoder.
+        return _decode(str(data, "utf-8"))
 
 
 def _require_pyvjoy() -> None:
@@ -47,9 +90,11 @@ def normalize(value: Any) -> Optional[int]:
 
     Supported input ranges:
 
-    * ``[-1, 1]`` – centred values (primary BCI output)
-    * ``[0, 1]`` – already normalised values
-    * integers within ``[0, AXIS_MAX]`` – passed through with clamping
+    * ``[-1, 1]`` – centred values (primary BCI output, with a small tolerance)
+    * anything else – raw vJoy units, passed through with clamping to
+      ``[0, AXIS_MAX]``
+
+    Non-numeric and non-finite values yield ``None``.
     """
 
     if value is None:
@@ -57,86 +102,142 @@ def normalize(value: Any) -> Optional[int]:
 
     try:
         numeric = float(value)
-    except (TypeError, ValueError):
+        if -1.1 <= numeric <= 1.1:
+            numeric = numeric * _HALF_SCALE + _HALF_SCALE
+        # ``int(x + 0.5)`` rounds half up without the generic ``round()`` call;
+        # negative inputs are clamped to zero either way.
+        scaled = int(numeric + 0.5)
+    except (TypeError, ValueError, OverflowError):
         return None
+    # Plain comparisons instead of ``max(0, min(...))`` avoid two builtin calls.
+    if scaled < 0:
+        return 0
+    if scaled > AXIS_MAX:
+        return AXIS_MAX
+    return scaled
+
+
+# Explicit signatures compile (or load from cache) at import, so the first
+# packet does not pay the JIT latency.
+@njit("int64(float64)", cache=True)
+def _scale_axis(value: float) -> int:  # pragma: no cover - JIT
+    if -1.1 <= value <= 1.1:
+        value = value * _HALF_SCALE + _HALF_SCALE
+    # Clamp before converting so huge raw values cannot overflow the integer cast.
+    return int(max(0.0, min(float(AXIS_MAX), value + 0.5)))
 
-    if -1.1 <= numeric <= 1.1:
-        scaled = (numeric * 0.5 + 0.5) * AXIS_MAX
-    elif -0.1 <= numeric <= 1.1:
-        # Treat values in [0, 1] (with small tolerance) as already normalised.
-        scaled = numeric * AXIS_MAX
-    else:
-        scaled = numeric
 
-    clamped = max(0, min(AXIS_MAX, int(round(scaled))))
-    return clamped
+@njit("UniTuple(int64, 4)(float64, float64, float64, float64)", cache=True)
+def _scale_axes(
+    throttle: float, roll: float, pitch: float, yaw: float
+) -> Tuple[int, int, int, int]:  # pragma: no cover - JIT
+    """:func:`normalize` for all four axes in one call; inputs must be finite floats."""
 
+    return _scale_axis(throttle), _scale_axis(roll), _scale_axis(pitch), _scale_axis(yaw)
 
-def _first_match(mapping: Mapping[str, Any], keys: Iterable[str]) -> Any:
-    for key in keys:
-        if key in mapping:
-            return mapping[key]
-    return None
 
+# Accepted keys per axis, in priority order; slots follow ``AXIS_ORDER``.
+_AXIS_ALIASES = (
+    ("throttle", "y", "speed"),
+    ("roll", "altitude", "x"),
+    ("pitch", "z", "elevator"),
+    ("yaw", "rx", "rz", "ry", "rudder"),
+)
+# Every lower-case alias mapped to ``(slot, rank)`` so a payload is resolved in
+# a single pass over its items.
+_ALIAS_SLOTS = {
+    alias: (slot, rank)
+    for slot, aliases in enumerate(_AXIS_ALIASES)
+    for rank, alias in enumerate(aliases)
+}
 
-def _extract_axes(payload: Mapping[str, Any]) -> Dict[str, Optional[int]]:
+
+Axes = Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]
+
+
+def _extract_axes(payload: Mapping[str, Any]) -> Axes:
     """Pick out joystick axes from a telemetry payload.
 
     The controller now broadcasts the canonical fields ``throttle``, ``roll``,
     ``pitch`` and ``yaw``. For compatibility with older payload shapes we
     accept a few aliases (e.g. ``altitude`` for roll, ``x``/``y``/``z`` for the
     primary axes, and ``speed`` as a throttle substitute). All lookups are
-    case-insensitive. The aliases also mirror the historical axis order so
+    case-insensitive, although exact lower-case canonical keys take precedence
+    when all four are present. The aliases also mirror the historical axis order so
     legacy consumers that still rely on ``x``/``y``/``z`` continue to function
     despite the updated joystick binding (Y → throttle, X → roll, Z → pitch,
     RX → yaw).
+
+    The result is indexed by ``THROTTLE``/``ROLL``/``PITCH``/``YAW``; axes
+    without a usable reading are ``None``.
     """
 
-    lowered = {k.lower(): v for k, v in payload.items()}
+    # The controller sends the four canonical lower-case keys: take them as-is
+    # and skip the alias scan entirely.
+    try:
+        return _axes_from_readings(payload["throttle"], payload["roll"], payload["pitch"], payload["yaw"])
+    except KeyError:
+        pass
+
+    readings: list[Any] = [None, None, None, None]
+    ranks = [len(aliases) for aliases in _AXIS_ALIASES]
+    lookup = _ALIAS_SLOTS.get
+    for key, value in payload.items():
+        # Canonical lower-case keys hit directly; only the rest pay for lower().
+        hit = lookup(key) or lookup(key.lower())
+        if hit is not None:
+            slot, rank = hit
+            # Higher-priority aliases win; for equal keys (differing only in
+            # case) the later item wins, as with a lower-cased dict.
+            if rank <= ranks[slot]:
+                readings[slot] = value
+                ranks[slot] = rank
+
+    return _axes_from_readings(*readings)
+
+
+def _decode_binary(data: bytes | memoryview) -> Optional[Axes]:
+    """Axes from one fixed-size binary frame, or ``None`` if it is malformed.
+
+    The frame is unpacked straight from ``data`` (typically the receive
+    buffer), skipping JSON decoding and the alias lookup entirely.
+    """
 
-    throttle_value = normalize(
-        _first_match(lowered, ("throttle", "y", "speed"))
-    )
-    roll_value = normalize(
-        _first_match(lowered, ("roll", "altitude", "x"))
-    )
-    pitch_value = normalize(
-        _first_match(lowered, ("pitch", "z", "elevator"))
-    )
-    yaw_value = normalize(
-        _first_match(lowered, ("yaw", "rx", "rz", "ry", "rudder"))
-    )
+    if len(data) != BINARY_PACKET.size or data[:4] != BINARY_MAGIC:
+        return None
+    _, yaw, roll, pitch, throttle, _speed, _ts = BINARY_PACKET.unpack_from(data)
+    return _axes_from_readings(throttle, roll, pitch, yaw)
 
-    axes: Dict[str, Optional[int]] = {
-        "throttle": throttle_value,
-        "roll": roll_value,
-        "pitch": pitch_value,
-        "yaw": yaw_value,
-    }
 
-    # Maintain legacy compatibility for consumers that still expect an
-    # ``altitude`` reading by mirroring the roll signal when the payload does
-    # not explicitly include it.
-    axes["altitude"] = roll_value
+def _axes_from_readings(throttle: Any, roll: Any, pitch: Any, yaw: Any) -> Axes:
+    """Scale raw readings to vJoy units; missing or invalid readings map to ``None``."""
 
-    return axes
+    # Common case: all four axes present and numeric, scaled in one (JIT) call.
+    # Missing, non-numeric or non-finite readings take the per-axis path.
+    try:
+        numeric = (float(throttle), float(roll), float(pitch), float(yaw))
+    except (TypeError, ValueError):
+        numeric = None
+    if numeric is not None and math.isfinite(sum(numeric)):
+        return _scale_axes(*numeric)
+    return normalize(throttle), normalize(roll), normalize(pitch), normalize(yaw)
 
 
 def _fill_missing_axes(
-    axes: Mapping[str, Optional[int]],
-    last_known: Dict[str, int],
-    fallback: Mapping[str, int],
-) -> Tuple[Dict[str, int], list[str]]:
+    axes: Axes,
+    last_known: list[int],
+    fallback: Tuple[int, int, int, int],
+) -> Tuple[Tuple[int, int, int, int], list[str]]:
     """Replace missing axis readings with the last known values.
 
     Parameters
     ----------
     axes:
-        Newly parsed axis values, where ``None`` indicates the payload did not
-        provide an updated reading for that axis.
+        Newly parsed axis values in ``AXIS_ORDER``, where ``None`` indicates
+        the payload did not provide an updated reading for that axis.
     last_known:
-        Mutable mapping of the most recent values pushed to vJoy.  The mapping
-        is updated in-place so subsequent payloads can continue from the latest
+        Mutable list of the most recent values pushed to vJoy.  The list is
+        updated in-place so subsequent payloads can continue from the latest
         readings.
     fallback:
         Default values used whenever an axis reading is missing.  Typically
@@ -145,23 +246,97 @@ def _fill_missing_axes(
 
     Returns
     -------
-    Tuple[Dict[str, int], list[str]]
-        A tuple containing the axis dictionary with missing entries replaced
-        as well as the list of axis names that required a fallback.  The list
-        is ordered according to the iteration order of ``last_known`` so the
+    Tuple[Tuple[int, int, int, int], list[str]]
+        The axis values with missing entries replaced, and the names of the
+        axes that required a fallback.  The names follow ``AXIS_ORDER`` so the
         logging remains stable for users diagnosing telemetry issues.
     """
 
-    filled: Dict[str, int] = {}
+    if None not in axes:
+        last_known[:] = axes
+        return axes, []  # type: ignore[return-value]
     missing: list[str] = []
-    for name, previous in list(last_known.items()):
-        value = axes.get(name)
+    for idx, value in enumerate(axes):
         if value is None:
-            value = fallback.get(name, previous)
-            missing.append(name)
-        last_known[name] = value
-        filled[name] = value
-    return filled, missing
+            value = fallback[idx]
+            missing.append(AXIS_ORDER[idx])
+        last_known[idx] = value
+    return tuple(last_known), missing  # type: ignore[return-value]
+
+
+_REPORT_FIELDS = ("wAxisX", "wAxisY", "wAxisZ", "wAxisXRot", "wSlider")
+
+
+def _make_axis_writer(device: Any) -> Callable[[Tuple[int, int, int, int]], None]:
+    """Build the per-packet function that pushes ``axes`` to ``device``.
+
+    pyvjoy exposes the device's full ``JOYSTICK_POSITION_V2`` report as
+    ``device.data``; filling its axis fields and calling ``device.update()``
+    submits every axis with a single ``UpdateVJD`` driver call. Builds without
+    the report fall back to one ``set_axis`` call per axis. The HID usages and
+    bound methods are resolved here once rather than for every packet.
+    """
+
+    report = getattr(device, "data", None)
+    update = getattr(device, "update", None)
+    if report is not None and callable(update) and all(hasattr(report, f) for f in _REPORT_FIELDS):
+
+        def write_report(axes: Tuple[int, int, int, int]) -> None:
+            report.wAxisX = axes[ROLL]
+            report.wAxisY = axes[THROTTLE]
+            # The first slider mirrors the throttle (see the set_axis path).
+            report.wSlider = axes[THROTTLE]
+            report.wAxisZ = axes[PITCH]
+            report.wAxisXRot = axes[YAW]
+            update()
+
+        return write_report
+
+    set_axis = device.set_axis
+    usage_x = pyvjoy.HID_USAGE_X
+    usage_y = pyvjoy.HID_USAGE_Y
+    usage_z = pyvjoy.HID_USAGE_Z
+    usage_rx = getattr(pyvjoy, "HID_USAGE_RX", getattr(pyvjoy, "HID_USAGE_RZ", usage_y))
+    # Mirror the throttle to an additional slider axis when available.
+    # Uncrashed prefers the first slider for throttle, while other simulators
+    # still read the traditional Y axis. Updating both keeps backwards
+    # compatibility with earlier profiles.
+    slider_usage = getattr(pyvjoy, "HID_USAGE_SL0", getattr(pyvjoy, "HID_USAGE_SLIDER", None))
+    vjoy_error = getattr(pyvjoy, "vJoyException", None)
+
+    def write_axes(axes: Tuple[int, int, int, int]) -> None:
+        set_axis(usage_x, axes[ROLL])
+        set_axis(usage_y, axes[THROTTLE])
+        if slider_usage is not None:
+            try:
+                set_axis(slider_usage, axes[THROTTLE])
+            except AttributeError:
+                pass
+            except Exception as exc:
+                if vjoy_error is None or not isinstance(exc, vjoy_error):
+                    raise
+        set_axis(usage_z, axes[PITCH])
+        set_axis(usage_rx, axes[YAW])
+
+    return write_axes
+
+
+def _drain_latest(sock: socket.socket, buf: bytearray) -> Tuple[Optional[int], int]:
+    """Empty the non-blocking socket's queue, keeping only the newest datagram.
+
+    Returns the newest datagram's length (left in ``buf``), or ``None`` when
+    nothing was queued, and the number of datagrams read. Older commands are
+    stale by the time they would reach vJoy, so they are dropped.
+    """
+
+    size = None
+    count = 0
+    while True:
+        try:
+            size = sock.recv_into(buf)
+        except BlockingIOError:
+            return size, count
+        count += 1
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -191,6 +366,10 @@ def main(argv: list[str] | None = None) -> None:
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         except OSError:
             pass
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF_BYTES)
+    except OSError:  # pragma: no cover - platform dependent limit
+        pass
 
     try:
         sock.bind((args.host, args.port))
@@ -199,38 +378,64 @@ def main(argv: list[str] | None = None) -> None:
         print(f"[ERROR] Failed to bind UDP port: {exc}")
         print("  - Try closing feed_uinput.py if running")
         sys.exit(1)
+    print(f"[INFO] UDP receive buffer: {sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)} bytes")
+    sock.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
 
     print("[INFO] Waiting for BCI UDP telemetry...")
 
     packet_counter = 0
-    last_report_time = time.time()
-
-    neutral_axes = {axis: normalize(0.0) for axis in AXIS_ORDER}
-    current_axes = dict(neutral_axes)
+    # Frames handled so far (see REPORT_CHECK_MASK); the report uses the
+    # monotonic clock so wall-clock adjustments cannot skew the rate.
+    handled = 0
+    last_report_time = time.monotonic()
+    # Datagrams are received into one reusable buffer instead of a fresh
+    # ``bytes`` object (and sender tuple) per packet.
+    buf = bytearray(4096)
+    view = memoryview(buf)
+
+    current_axes = list(NEUTRAL_AXES)
+
+    write_axes = _make_axis_writer(j)
+    # Last values pushed to the driver; identical packets (common while the
+    # pilot is at rest) then cost no driver call at all.
+    last_written: Optional[Tuple[int, int, int, int]] = None
 
     try:
         while True:
+            selector.select()
             try:
-                data, _ = sock.recvfrom(4096)
+                nbytes, received = _drain_latest(sock, buf)
             except OSError as exc:
                 print(f"[ERROR] UDP socket error: {exc}")
                 time.sleep(0.5)
                 continue
 
-            packet_counter += 1
-
-            try:
-                payload = json.loads(data.decode("utf-8"))
-            except json.JSONDecodeError:
-                print("[WARN] Received non-JSON UDP payload")
+            packet_counter += received
+            if not nbytes:
                 continue
 
-            if not isinstance(payload, Mapping):
-                print("[WARN] Ignoring UDP packet with unexpected structure")
-                continue
-
-            axes = _extract_axes(payload)
-            axes, missing = _fill_missing_axes(axes, current_axes, neutral_axes)
+            if view[:4] == BINARY_MAGIC:
+                axes = _decode_binary(view[:nbytes])
+                if axes is None:
+                    print("[WARN] Ignoring malformed binary UDP packet")
+                    continue
+            else:
+                try:
+                    payload = _loads(view[:nbytes])
+                except ValueError:  # JSON / UTF-8 decode errors from either backend
+                    print("[WARN] Received non-JSON UDP payload")
+                    continue
+
+                # Both JSON backends return a plain dict for objects; an exact
+                # type check avoids the ABC machinery of isinstance(Mapping).
+                if type(payload) is not dict:
+                    print("[WARN] Ignoring UDP packet with unexpected structure")
+                    continue
+
+                axes = _extract_axes(payload)
+            axes, missing = _fill_missing_axes(axes, current_axes, NEUTRAL_AXES)
             if missing:
                 print(
                     "[WARN] Missing axis data for: "
@@ -239,34 +444,9 @@ def main(argv: list[str] | None = None) -> None:
                 )
 
             try:
-                j.set_axis(pyvjoy.HID_USAGE_X, axes["roll"])
-                j.set_axis(pyvjoy.HID_USAGE_Y, axes["throttle"])
-                # Mirror the throttle to an additional slider axis when
-                # available.  Uncrashed prefers the first slider for throttle,
-                # while other simulators still read the traditional Y axis.
-                # Updating both keeps backwards compatibility with earlier
-                # profiles.
-                slider_usage = getattr(
-                    pyvjoy,
-                    "HID_USAGE_SL0",
-                    getattr(pyvjoy, "HID_USAGE_SLIDER", None),
-                )
-                if slider_usage is not None:
-                    try:
-                        j.set_axis(slider_usage, axes["throttle"])
-                    except AttributeError:
-                        pass
-                    except Exception as exc:
-                        vjoy_error = getattr(pyvjoy, "vJoyException", None)
-                        if vjoy_error is None or not isinstance(exc, vjoy_error):
-                            raise
-                j.set_axis(pyvjoy.HID_USAGE_Z, axes["pitch"])
-                usage_rx = getattr(
-                    pyvjoy,
-                    "HID_USAGE_RX",
-                    getattr(pyvjoy, "HID_USAGE_RZ", pyvjoy.HID_USAGE_Y),
-                )
-                j.set_axis(usage_rx, axes["yaw"])
+                if axes != last_written:
+                    write_axes(axes)
+                    last_written = axes
             except pyvjoy.vJoyException as exc:  # type: ignore[attr-defined]
                 print(f"[ERROR] vJoy update failed: {exc}")
                 time.sleep(0.5)
@@ -276,13 +456,16 @@ def main(argv: list[str] | None = None) -> None:
                 time.sleep(0.5)
                 continue
 
-            now = time.time()
+            handled += 1
+            if handled & REPORT_CHECK_MASK:
+                continue
+            now = time.monotonic()
             elapsed = now - last_report_time
             if elapsed >= 1.0:
                 rate = packet_counter / max(elapsed, 1e-9)
                 print(
-                    f"[INFO] {rate:5.1f} pkt/s | Throttle={axes['throttle']:5d} "
-                    f"Roll={axes['roll']:5d} Pitch={axes['pitch']:5d} Yaw={axes['yaw']:5d}"
+                    f"[INFO] {rate:5.1f} pkt/s | Throttle={axes[THROTTLE]:5d} "
+                    f"Roll={axes[ROLL]:5d} Pitch={axes[PITCH]:5d} Yaw={axes[YAW]:5d}"
                 )
                 packet_counter = 0
                 last_report_time = now
@@ -290,6 +473,7 @@ def main(argv: list[str] | None = None) -> None:
         print("\n[INFO] Interrupted by user, shutting down...")
     finally:
         try:
+            selector.close()
             sock.close()
         finally:
             if RelinquishVJD is not None:
@@ -4,22 +4,35 @@ from __future__ import annotations
 
 import argparse
 import json
-import queue
 import socket
 import threading
 import time
 import tkinter as tk
+from collections import deque
 from dataclasses import dataclass
 from tkinter import ttk
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+try:  # pragma: no cover - optional dependency guard
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json is used when orjson is absent
+    orjson = None
 
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 5005
 
+if orjson is not None:
+    _loads = orjson.loads
+else:  # pragma: no cover - depends on the environment
+    _decode = json.JSONDecoder().decode
+
+    def _loads(data: bytes | memoryview) -> Any:
+        return _decode(str(data, "utf-8"))
+
 
 @dataclass
 class TelemetrySample:
-    timestamp: float
+    timestamp: float  # time.monotonic() at receipt
     payload: Dict[str, float | str]
 
 
@@ -30,7 +43,7 @@ class TelemetryReceiver(threading.Thread):
         self,
         host: str,
         port: int,
-        out_queue: "queue.Queue[TelemetrySample]",
+        out_queue: "deque[TelemetrySample]",
         idle_timeout: float,
     ) -> None:
         super().__init__(daemon=True)
@@ -61,9 +74,9 @@ class TelemetryReceiver(threading.Thread):
         try:
             sock.bind((self._host, self._port))
         except OSError as exc:
-            self._queue.put(
+            self._queue.append(
                 TelemetrySample(
-                    timestamp=time.time(),
+                    timestamp=time.monotonic(),
                     payload={"__text__": f"Failed to bind {(self._host, self._port)}: {exc}"},
                 )
             )
@@ -71,16 +84,18 @@ class TelemetryReceiver(threading.Thread):
             return
 
         self._socket = sock
+        buffer = bytearray(2048)
+        view = memoryview(buffer)
         last_packet = 0.0
         while not self._stop_event.is_set():
             try:
-                data, _ = sock.recvfrom(2048)
+                nbytes = sock.recv_into(buffer)
             except socket.timeout:
                 if self._idle_timeout > 0 and last_packet:
-                    if time.time() - last_packet > self._idle_timeout:
-                        self._queue.put(
+                    if time.monotonic() - last_packet > self._idle_timeout:
+                        self._queue.append(
                             TelemetrySample(
-                                timestamp=time.time(),
+                                timestamp=time.monotonic(),
                                 payload={"__text__": "Idle timeout reached."},
                             )
                         )
@@ -90,8 +105,8 @@ class TelemetryReceiver(threading.Thread):
                 break
 
             try:
-                payload = json.loads(data.decode("utf-8"))
-            except json.JSONDecodeError:
+                payload = _loads(view[:nbytes])
+            except ValueError:  # JSON / UTF-8 decode errors from either backend
                 continue
 
             parsed: Dict[str, float | str] = {}
@@ -124,8 +139,8 @@ class TelemetryReceiver(threading.Thread):
             if yaw is not None:
                 parsed["yaw"] = yaw
 
-            last_packet = time.time()
-            self._queue.put(TelemetrySample(timestamp=last_packet, payload=parsed))
+            last_packet = time.monotonic()
+            self._queue.append(TelemetrySample(timestamp=last_packet, payload=parsed))
 
         try:
             sock.close()
@@ -136,7 +151,9 @@ class TelemetryReceiver(threading.Thread):
 class TelemetryApp:
     def __init__(self, root: tk.Tk, host: str, port: int, idle_timeout: float) -> None:
         self.root = root
-        self.queue: "queue.Queue[TelemetrySample]" = queue.Queue()
+        # Single producer, single consumer: deque.append/popleft are atomic
+        # under the GIL, so no Queue lock/condition is needed per packet.
+        self.queue: "deque[TelemetrySample]" = deque()
         self.receiver = TelemetryReceiver(host, port, self.queue, idle_timeout)
         self.receiver.start()
 
@@ -190,29 +207,34 @@ class TelemetryApp:
         self.status_label.grid(row=len(axes), column=0, columnspan=3, sticky="ew", pady=(12, 0))
 
     def _poll_queue(self) -> None:
-        try:
-            while True:
-                sample = self.queue.get_nowait()
-                self._handle_sample(sample)
-        except queue.Empty:
-            pass
+        # Merge everything queued since the last poll so each Tk variable is
+        # written at most once per poll, however many packets arrived.
+        latest: Dict[str, float | str] = {}
+        received = 0
+        while self.queue:
+            sample = self.queue.popleft()
+            if "__text__" in sample.payload:
+                self.status_var.set(sample.payload["__text__"])
+                continue
+            latest.update(sample.payload)
+            received += 1
+            self.last_update = sample.timestamp
+        if received:
+            self._show_axes(latest)
+            self.samples += received
 
         if self.receiver.is_alive():
             if self.last_update:
-                age = time.time() - self.last_update
+                age = time.monotonic() - self.last_update
                 self.status_var.set(f"Samples: {self.samples} | Last packet: {age:.1f}s ago")
             self.root.after(100, self._poll_queue)
         else:
             if not self.status_var.get():
                 self.status_var.set("Receiver stopped.")
 
-    def _handle_sample(self, sample: TelemetrySample) -> None:
-        if "__text__" in sample.payload:
-            self.status_var.set(sample.payload["__text__"])
-            return
-
+    def _show_axes(self, payload: Dict[str, float | str]) -> None:
         for axis in ("throttle", "roll", "pitch", "yaw"):
-            value = sample.payload.get(axis)
+            value = payload.get(axis)
             if value is None:
                 continue
             clipped = max(-1.0, min(1.0, float(value)))
@@ -220,9 +242,6 @@ class TelemetryApp:
             self.progress_vars[axis].set(percent)
             self.value_labels[axis].set(f"{clipped:+.2f}")
 
-        self.samples += 1
-        self.last_update = sample.timestamp
-
     def on_close(self) -> None:
         self.receiver.stop()
         self.root.destroy()
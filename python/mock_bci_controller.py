@@ -1,9 +1,10 @@
 # python/mock_bci_controller.py
 # -*- coding: utf-8 -*-
 # Mock BCI controller: generates synthetic 3-axis commands over UDP
-import time, json, socket, math, random, os
+import time, socket, math, random, os
 from typing import Iterable, List, Tuple
 
+
 def _split_target_spec(spec: str) -> List[str]:
     parts: List[str] = []
     for entry in spec.replace(";", ",").split(","):
@@ -36,51 +37,69 @@ def _parse_target_entries(entries: Iterable[str], default_host: str) -> List[Tup
 
 
 def _deduplicate_targets(targets: Iterable[Tuple[str, int]]) -> List[Tuple[str, int]]:
-    seen: set[Tuple[str, int]] = set()
-    unique: List[Tuple[str, int]] = []
-    for host, port in targets:
-        key = (host, port)
-        if key in seen:
-            continue
-        unique.append(key)
-        seen.add(key)
-    return unique
+    # dict 保持插入顺序: 一次遍历即可按首次出现顺序去重
+    return list(dict.fromkeys((host, port) for host, port in targets))
+
+
+# 一个完整周期的正弦查表 (长度为 2 的幂, 取模可用位与), 每 tick 只做一次列表索引
+SINE_TABLE_SIZE = 4096
+_SINE_MASK = SINE_TABLE_SIZE - 1
+_SINE = [math.sin(2 * math.pi * k / SINE_TABLE_SIZE) for k in range(SINE_TABLE_SIZE)]
+
 
+def _sine(cycles: float) -> float:
+    """返回 sin(2π·cycles), 相位量化到 1/SINE_TABLE_SIZE 周期。"""
+    return _SINE[int(cycles * SINE_TABLE_SIZE) & _SINE_MASK]
+
+
+# 与 bci_controller.PAYLOAD_TEMPLATE 相同的定长报文, 省去逐 tick 的 dict 构造与 json 编码
+PAYLOAD_TEMPLATE = (
+    b'{"yaw": %.4f, "roll": %.4f, "altitude": %.4f, "pitch": %.4f, '
+    b'"throttle": %.4f, "speed": %.4f, "ts": %.6f}'
+)
+
+# 控制台回显: 默认每 PRINT_EVERY 帧 (20 Hz 下约 2 s) 打印一次, BCI_FLYSTICK_MOCK_VERBOSE=1 时逐帧打印
+PRINT_EVERY = 1 if os.environ.get("BCI_FLYSTICK_MOCK_VERBOSE") == "1" else 40
 
 UDP_PRIMARY = ("127.0.0.1", 5005)
 env_spec = os.environ.get("BCI_FLYSTICK_UDP_FANOUT", "")
 extras = _parse_target_entries(_split_target_spec(env_spec), UDP_PRIMARY[0]) if env_spec else []
 UDP_TARGETS = _deduplicate_targets([UDP_PRIMARY, *extras])
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+# 每个目标一个已 connect 的套接字: send 无需每次传入并解析目标地址
+senders = []
+for target in UDP_TARGETS:
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect(target)
+    senders.append(sender)
 
 print("[MOCK] Sending synthetic Yaw/Altitude/Speed to:")
 for host, port in UDP_TARGETS:
     print(f"    - {(host, port)}")
-t0 = time.time()
+frame = 0
+t0 = time.monotonic()  # 波形相位用单调时钟, 不受系统校时影响
 while True:
-    t = time.time() - t0
+    t = time.monotonic() - t0
     # 平滑正弦 + 少许噪声
-    yaw = 0.8 * math.sin(2*math.pi*0.2*t) + random.uniform(-0.05, 0.05)        # [-1,1]
-    alt = 0.6 * math.sin(2*math.pi*0.13*t + 1.1) + random.uniform(-0.05, 0.05) # [-1,1]
-    pitch = 0.5 * math.sin(2*math.pi*0.17*t + 0.7) + random.uniform(-0.05, 0.05)
-    thr = 0.7 * math.sin(2*math.pi*0.11*t + 2.2) + random.uniform(-0.05, 0.05)
+    # 相位偏移以周期为单位 (弧度 / 2π)
+    yaw = 0.8 * _sine(0.2*t) + random.uniform(-0.05, 0.05)              # [-1,1]
+    alt = 0.6 * _sine(0.13*t + 0.1751) + random.uniform(-0.05, 0.05)    # [-1,1]
+    pitch = 0.5 * _sine(0.17*t + 0.1114) + random.uniform(-0.05, 0.05)
+    thr = 0.7 * _sine(0.11*t + 0.3501) + random.uniform(-0.05, 0.05)
 
     yaw = max(-1.0, min(1.0, yaw))
     alt = max(-1.0, min(1.0, alt))
     pitch = max(-1.0, min(1.0, pitch))
     thr = max(-1.0, min(1.0, thr))
 
-    msg = {
-        "yaw": round(yaw, 4),
-        "roll": round(alt, 4),
-        "altitude": round(alt, 4),
-        "pitch": round(pitch, 4),
-        "throttle": round(thr, 4),
-        "speed": round((thr + 1.0) * 0.5, 4),
-        "ts": time.time(),
-    }
-    encoded = json.dumps(msg).encode("utf-8")
-    for target in UDP_TARGETS:
-        sock.sendto(encoded, target)
-    print(msg)
+    encoded = PAYLOAD_TEMPLATE % (yaw, alt, alt, pitch, thr, (thr + 1.0) * 0.5, time.time())
+    for sender in senders:
+        try:
+            sender.send(encoded)
+        except ConnectionRefusedError:
+            # 已连接的 UDP 套接字会报告接收端尚未启动 (ICMP 不可达); 丢弃本帧即可
+            pass
+    if frame % PRINT_EVERY == 0:
+        print(encoded.decode("ascii"))
+    frame += 1
     time.sleep(0.05)  # 20 Hz
@@ -7,7 +7,6 @@ import os
 import socket
 import time
 import tkinter as tk
-from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 from tkinter import ttk
@@ -15,6 +14,12 @@ from typing import Dict, Iterable, List, Sequence, Tuple
 
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 5005
+# Fixed payload layout, byte-for-byte what ``json.dumps`` produced for the
+# payload dict; ``%r`` emits the shortest round-tripping float repr.
+PAYLOAD_TEMPLATE = (
+    b'{"ts": %r, "yaw": %r, "roll": %r, "pitch": %r, '
+    b'"throttle": %r, "altitude": %r, "speed": %r}'
+)
 @dataclass
 class Action:
     name: str
@@ -160,15 +165,7 @@ def _parse_target_entries(entries: Sequence[str], default_host: str) -> List[Tup
 
 
 def _deduplicate_targets(targets: Iterable[Tuple[str, int]]) -> List[Tuple[str, int]]:
-    seen: set[Tuple[str, int]] = set()
-    unique: List[Tuple[str, int]] = []
-    for host, port in targets:
-        key = (host, port)
-        if key in seen:
-            continue
-        unique.append(key)
-        seen.add(key)
-    return unique
+    return list(dict.fromkeys((host, port) for host, port in targets))
 
 
 def _parse_env_targets(default_host: str) -> List[Tuple[str, int]]:
@@ -191,6 +188,13 @@ class CommandSender:
         self.host = host
         self.port = port
         self.axis_signs = axis_signs
+        # Signs resolved once, in wire order (yaw, roll, pitch, throttle).
+        self._signs = (
+            axis_signs.get("yaw", 1.0),
+            axis_signs.get("roll", 1.0),
+            axis_signs.get("pitch", 1.0),
+            axis_signs.get("throttle", 1.0),
+        )
         self.echo = echo
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         targets: List[Tuple[str, int]] = [(host, port)]
@@ -198,36 +202,80 @@ class CommandSender:
             targets.extend(extra_targets)
         targets.extend(_parse_env_targets(host))
         self.targets = _deduplicate_targets(targets)
+        # A full send buffer drops the frame instead of stalling the Tk thread.
+        self.socket.setblocking(False)
+        # With a single sink, connect once so each send skips address handling.
+        self._connected = False
+        if len(self.targets) == 1:
+            try:
+                self.socket.connect(self.targets[0])
+                self._connected = True
+            except OSError:
+                pass
 
     def send(self, axes: Dict[str, float]) -> Dict[str, float]:
-        payload = {"ts": time.time()}
-        roll_value = float(axes.get("roll", axes.get("altitude", 0.0)))
-        axis_values = {
-            "yaw": float(axes.get("yaw", 0.0)),
-            "roll": roll_value,
-            "pitch": float(axes.get("pitch", 0.0)),
-            "throttle": float(axes.get("throttle", axes.get("speed", 0.0))),
+        get = axes.get
+        return self.send_axes(
+            float(get("yaw", 0.0)),
+            float(get("roll", get("altitude", 0.0))),
+            float(get("pitch", 0.0)),
+            float(get("throttle", get("speed", 0.0))),
+        )
+
+    def send_axes(self, yaw: float, roll: float, pitch: float, throttle: float) -> Dict[str, float]:
+        """Like :meth:`send`, with the raw axis values passed positionally."""
+        sign_yaw, sign_roll, sign_pitch, sign_throttle = self._signs
+        ts = time.time()
+        yaw *= sign_yaw
+        roll *= sign_roll
+        pitch *= sign_pitch
+        throttle *= sign_throttle
+        # Clamp to [-1, 1] with comparisons rather than max/min calls; NaN
+        # lands on +1 exactly as ``max(-1.0, min(1.0, nan))`` did.
+        if not -1.0 <= yaw <= 1.0:
+            yaw = -1.0 if yaw < 0.0 else 1.0
+        if not -1.0 <= roll <= 1.0:
+            roll = -1.0 if roll < 0.0 else 1.0
+        if not -1.0 <= pitch <= 1.0:
+            pitch = -1.0 if pitch < 0.0 else 1.0
+        if not -1.0 <= throttle <= 1.0:
+            throttle = -1.0 if throttle < 0.0 else 1.0
+        speed = (throttle + 1.0) * 0.5
+        encoded = PAYLOAD_TEMPLATE % (ts, yaw, roll, pitch, throttle, roll, speed)
+        payload = {
+            "ts": ts,
+            "yaw": yaw,
+            "roll": roll,
+            "pitch": pitch,
+            "throttle": throttle,
+            "altitude": roll,
+            "speed": speed,
         }
-        for axis, value in axis_values.items():
-            sign = self.axis_signs.get(axis, 1.0)
-            payload[axis] = max(-1.0, min(1.0, value * sign))
-        payload["altitude"] = payload["roll"]
-        payload["speed"] = (payload["throttle"] + 1.0) * 0.5
-        message = json.dumps(payload)
-        encoded = message.encode("utf-8")
-        for target in self.targets:
+        if self._connected:
             try:
-                self.socket.sendto(encoded, target)
+                self.socket.send(encoded)
             except OSError as exc:
                 if self.echo:
-                    print(f"[WARN] Failed to send to {target}: {exc}")
+                    print(f"[WARN] Failed to send to {self.targets[0]}: {exc}")
+        else:
+            for target in self.targets:
+                try:
+                    self.socket.sendto(encoded, target)
+                except OSError as exc:
+                    if self.echo:
+                        print(f"[WARN] Failed to send to {target}: {exc}")
         if self.echo:
             sinks = ", ".join(f"{host}:{port}" for host, port in self.targets)
-            print(f"Sent UDP payload: {message} -> [{sinks}]")
+            print(f"Sent UDP payload: {encoded.decode('ascii')} -> [{sinks}]")
         return payload
 
 
 class MockEEGGui:
+    NEUTRAL_KEYS = frozenset({"SPACE", "0"})
+    # X11 autorepeat delivers a held key as back-to-back release/press pairs;
+    # a release only takes effect if no new press arrives within this window.
+    RELEASE_GRACE_MS = 30
+
     def __init__(
         self,
         root: tk.Tk,
@@ -245,6 +293,12 @@ class MockEEGGui:
         for action in self._ordered_actions:
             if action.binding:
                 self._binding_map[action.binding.upper()] = action
+        # Raw keysym -> canonical upper-case name for every key we react to, so
+        # the event handlers skip ``str.upper()``; other keys still fall back to it.
+        self._key_names: Dict[str, str] = {}
+        for canonical in (*self._binding_map, *self.NEUTRAL_KEYS):
+            for variant in (canonical, canonical.lower(), canonical.capitalize()):
+                self._key_names[variant] = canonical
         self._bind_keys()
         self.last_label = tk.StringVar(
             value=self._format_status(
@@ -258,10 +312,11 @@ class MockEEGGui:
         }
         self._axis_action_stack: Dict[str, List[Action]] = {axis: [] for axis in self._axes}
         self._pressed_keys: set[str] = set()
+        self._pending_releases: Dict[str, str] = {}
         self._current_label = "Neutral"
-        self._sample_history: deque[Dict[str, float]] = deque()
-        self._sample_counter = 0
         self._update_interval_ms = 50
+        self._last_tick = time.monotonic()
+        self._next_deadline = self._last_tick
         self._schedule_next_tick()
 
     def _build_ui(self) -> None:
@@ -318,7 +373,13 @@ class MockEEGGui:
         self.root.bind("<KeyRelease>", self._on_key_release)
 
     def _on_key_press(self, event: tk.Event[tk.KeyPressEvent]) -> None:
-        key = event.keysym.upper()
+        keysym = event.keysym
+        key = self._key_names.get(keysym) or keysym.upper()
+        pending = self._pending_releases.pop(key, None)
+        if pending is not None:
+            # Autorepeat: the key never went up, so drop the deferred release.
+            self.root.after_cancel(pending)
+            return
         if key in self._pressed_keys:
             return
         self._pressed_keys.add(key)
@@ -326,11 +387,20 @@ class MockEEGGui:
         if action:
             self._on_action_press(action)
             return
-        if key in {"SPACE", "0"}:
+        if key in self.NEUTRAL_KEYS:
             self._send_neutral()
 
     def _on_key_release(self, event: tk.Event[tk.KeyPressEvent]) -> None:
-        key = event.keysym.upper()
+        keysym = event.keysym
+        key = self._key_names.get(keysym) or keysym.upper()
+        if key in self._pending_releases:
+            return
+        self._pending_releases[key] = self.root.after(
+            self.RELEASE_GRACE_MS, lambda: self._finish_key_release(key)
+        )
+
+    def _finish_key_release(self, key: str) -> None:
+        self._pending_releases.pop(key, None)
         self._pressed_keys.discard(key)
         action = self._binding_map.get(key)
         if action:
@@ -359,47 +429,59 @@ class MockEEGGui:
                 self._current_label = "Neutral"
 
     def _send_neutral(self) -> None:
+        for pending in self._pending_releases.values():
+            self.root.after_cancel(pending)
+        self._pending_releases.clear()
         self._pressed_keys.clear()
         for axis in self._axes:
             self._axis_action_stack[axis].clear()
             state = self._axis_states[axis]
             state.reset()
         self._current_label = "Neutral"
-        payload = self.sender.send({axis: 0.0 for axis in self._axes})
-        self._record_sample(payload)
+        payload = self.sender.send_axes(0.0, 0.0, 0.0, 0.0)
         self.last_label.set(self._format_status("Neutral", payload))
 
     @staticmethod
     def _format_status(label: str, payload: Dict[str, float]) -> str:
-        axes = []
-        for axis in ("yaw", "roll", "pitch", "throttle"):
-            value = float(payload.get(axis, 0.0))
-            axes.append(f"{axis.title()}: {value:+.2f}")
-        return f"Sent: {label} | " + "  ".join(axes)
+        get = payload.get
+        return (
+            f"Sent: {label} | Yaw: {get('yaw', 0.0):+.2f}  Roll: {get('roll', 0.0):+.2f}"
+            f"  Pitch: {get('pitch', 0.0):+.2f}  Throttle: {get('throttle', 0.0):+.2f}"
+        )
 
     def _schedule_next_tick(self) -> None:
-        self.root.after(self._update_interval_ms, self._tick)
+        # Arm against an absolute deadline so handler cost and Tk timer
+        # granularity do not accumulate into the cadence.
+        period = self._update_interval_ms / 1000.0
+        now = time.monotonic()
+        self._next_deadline += period
+        if self._next_deadline < now:
+            # Fell behind (e.g. the window was being dragged): resync instead
+            # of firing a burst of catch-up ticks.
+            self._next_deadline = now + period
+        delay_ms = max(1, int((self._next_deadline - now) * 1000))
+        self.root.after(delay_ms, self._tick)
 
     def _tick(self) -> None:
-        dt = self._update_interval_ms / 1000.0
+        now = time.monotonic()
+        dt = now - self._last_tick
+        self._last_tick = now
         sensitivity = max(1, int(self._sensitivity_var.get()))
         rate = 0.5 * sensitivity
         changed = False
         for axis, state in self._axis_states.items():
             changed = state.step(rate, dt) or changed
         if changed:
-            payload = self.sender.send({axis: state.value for axis, state in self._axis_states.items()})
-            self._record_sample(payload)
+            states = self._axis_states
+            payload = self.sender.send_axes(
+                states["yaw"].value,
+                states["roll"].value,
+                states["pitch"].value,
+                states["throttle"].value,
+            )
             self.last_label.set(self._format_status(self._current_label, payload))
         self._schedule_next_tick()
 
-    def _record_sample(self, payload: Dict[str, float]) -> None:
-        self._sample_history.append(payload)
-        self._sample_counter += 1
-        if self._sample_counter >= 100:
-            self._sample_history.clear()
-            self._sample_counter = 0
-
     def _update_sensitivity_label(self) -> None:
         value = max(1, int(self._sensitivity_var.get()))
         self._sensitivity_label.set(f"Current level: {value}")
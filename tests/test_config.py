@@ -49,6 +49,7 @@ def test_load_cfg_success(tmp_path: Path) -> None:
     assert cfg["udp_target"] == ("127.0.0.1", 6000)
     assert cfg["gains"]["throttle"] == 1.0
     assert cfg["gains"]["pitch"] == 1.0
+    assert cfg["band_power"] == "fft"
 
 
 def test_resolve_board_id_alias() -> None:
@@ -76,3 +76,107 @@ def test_mock_gui_udp_flow() -> None:
     assert forwarded_primary["speed"] == payload["speed"] == 1.0
     assert "ts" in forwarded_primary and isinstance(forwarded_primary["ts"], float)
     assert forwarded_secondary == forwarded_primary
+
+
+def test_controller_fanout_reaches_every_target() -> None:
+    from bci_controller import UdpFanout  # type: ignore
+
+    receivers = []
+    for _ in range(3):
+        rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        rx.bind(("127.0.0.1", 0))
+        rx.settimeout(2)
+        receivers.append(rx)
+    targets = [("127.0.0.1", rx.getsockname()[1]) for rx in receivers]
+    targets[1] = ("localhost", targets[1][1])
+
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        fanout = UdpFanout(sender, targets)
+        for payload in (b'{"yaw": 0.5}', b'{"yaw": -0.25, "roll": 0.1}'):
+            fanout.send(payload)
+            for rx in receivers:
+                assert rx.recvfrom(4096)[0] == payload
+    finally:
+        sender.close()
+        for rx in receivers:
+            rx.close()
+
+
+def test_controller_payload_is_json() -> None:
+    from bci_controller import encode_payload  # type: ignore
+
+    payload = json.loads(encode_payload(0.123456, -0.5, 1.0, -1.0, 1700000000.25).decode("utf-8"))
+
+    assert payload == {
+        "yaw": 0.1235,
+        "roll": -0.5,
+        "altitude": -0.5,
+        "pitch": 1.0,
+        "throttle": -1.0,
+        "speed": 0.0,
+        "ts": 1700000000.25,
+    }
+
+
+def test_controller_fanout_single_target_uses_connected_socket() -> None:
+    from bci_controller import UdpFanout  # type: ignore
+
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind(("127.0.0.1", 0))
+    rx.settimeout(2)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        fanout = UdpFanout(sender, [("127.0.0.1", rx.getsockname()[1])])
+        assert sender.getpeername() == rx.getsockname()
+        fanout.send(b"{}")
+        assert rx.recvfrom(4096)[0] == b"{}"
+        rx.close()
+        # A vanished receiver must not raise into the control loop.
+        fanout.send(b"{}")
+        fanout.send(b"{}")
+    finally:
+        sender.close()
+        rx.close()
+
+
+def test_feed_uinput_drain_keeps_newest_packet() -> None:
+    from feed_uinput import drain_latest  # type: ignore
+
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind(("127.0.0.1", 0))
+    rx.setblocking(False)
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    view = memoryview(bytearray(2048))
+    try:
+        assert drain_latest(rx, view) is None
+        for payload in (b"first-long-packet", b"second", b"third"):
+            tx.sendto(payload, rx.getsockname())
+        # Loopback delivery is synchronous, so all three are queued already.
+        size = drain_latest(rx, view)
+        assert size is not None and bytes(view[:size]) == b"third"
+        assert drain_latest(rx, view) is None
+    finally:
+        tx.close()
+        rx.close()
+
+
+def test_feed_uinput_batched_receive_returns_newest_packet() -> None:
+    from feed_uinput import LatestDatagram  # type: ignore
+
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind(("127.0.0.1", 0))
+    rx.setblocking(False)
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receive = LatestDatagram(rx, batch=4)
+    try:
+        assert receive() is None
+        # More packets than one batch: the backlog spans several recvmmsg calls.
+        for idx in range(10):
+            tx.sendto(b"packet-%d" % idx, rx.getsockname())
+        latest = receive()
+        assert latest is not None and bytes(latest) == b"packet-9"
+        assert receive() is None
+    finally:
+        tx.close()
+        rx.close()
@@ -4,8 +4,8 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "python"))
 
-from feed_uinput import m01, m11  # type: ignore
-from feed_vjoy import normalize, _extract_axes, _fill_missing_axes  # type: ignore
+from feed_uinput import decode_command, emit_changed, m01, m11  # type: ignore
+from feed_vjoy import PITCH, ROLL, THROTTLE, YAW, normalize, _extract_axes, _fill_missing_axes  # type: ignore
 
 
 def test_normalize_range() -> None:
@@ -16,6 +16,10 @@ def test_normalize_range() -> None:
     # Values outside [-1, 1] but within the vJoy range are passed through.
     assert normalize(1.5) == 2
     assert normalize(50000) == 32767
+    # Garbage and non-finite values are reported as missing.
+    assert normalize("abc") is None
+    assert normalize(float("nan")) is None
+    assert normalize(float("inf")) is None
 
 
 def test_extract_axes_standard_payload() -> None:
@@ -26,11 +30,10 @@ def test_extract_axes_standard_payload() -> None:
         "pitch": -1.0,
     }
     axes = _extract_axes(payload)
-    assert axes["yaw"] == normalize(payload["yaw"])
-    assert axes["roll"] == normalize(payload["altitude"])
-    assert axes["altitude"] == normalize(payload["altitude"])
-    assert axes["throttle"] == normalize(payload["throttle"])
-    assert axes["pitch"] == normalize(payload["pitch"])
+    assert axes[YAW] == normalize(payload["yaw"])
+    assert axes[ROLL] == normalize(payload["altitude"])
+    assert axes[THROTTLE] == normalize(payload["throttle"])
+    assert axes[PITCH] == normalize(payload["pitch"])
 
 
 def test_extract_axes_with_aliases() -> None:
@@ -42,39 +45,66 @@ def test_extract_axes_with_aliases() -> None:
         "speed": 0.6,
     }
     axes = _extract_axes(payload)
-    assert axes["roll"] == normalize(1.0)
-    assert axes["pitch"] == normalize(-0.5)
-    assert axes["throttle"] == normalize(0.25)
-    assert axes["yaw"] == normalize(0.75)
+    assert axes[ROLL] == normalize(1.0)
+    assert axes[PITCH] == normalize(-0.5)
+    assert axes[THROTTLE] == normalize(0.25)
+    assert axes[YAW] == normalize(0.75)
+
+
+def test_extract_axes_fused_path_matches_normalize() -> None:
+    payload = {"throttle": 0.4, "roll": -1.5, "pitch": 2000, "yaw": 1e300}
+    axes = _extract_axes(payload)
+    assert axes == tuple(normalize(value) for value in payload.values())
+    # A single non-finite reading only affects its own axis.
+    axes = _extract_axes({**payload, "yaw": float("nan")})
+    assert axes[YAW] is None and axes[THROTTLE] == normalize(0.4)
+
+
+def test_binary_frame_matches_json_axes() -> None:
+    import struct
+
+    from feed_vjoy import _decode_binary  # type: ignore
+
+    frame = struct.pack("<4s5fd", b"BFS1", -0.5, 0.25, 0.75, -1.0, 0.0, 123.0)
+    axes = _decode_binary(memoryview(frame))
+    expected = _extract_axes({"yaw": -0.5, "roll": 0.25, "pitch": 0.75, "throttle": -1.0})
+    assert axes == expected
+    assert _decode_binary(frame[:-1]) is None
 
 
 def test_extract_axes_speed_fallback() -> None:
     payload = {"speed": 0.6}
     axes = _extract_axes(payload)
-    assert axes["throttle"] == normalize(0.6)
+    assert axes[THROTTLE] == normalize(0.6)
+    # The canonical key outranks its aliases regardless of payload order or case.
+    axes = _extract_axes({"speed": 0.6, "Y": -0.2, "THROTTLE": 0.2})
+    assert axes[THROTTLE] == normalize(0.2)
 
 
 def test_fill_missing_axes_defaults_to_neutral() -> None:
-    neutral = {axis: normalize(0.0) for axis in ("throttle", "roll", "pitch", "yaw")}
-    last_known = dict(neutral)
-
-    update = {
-        "yaw": normalize(0.25),
-        "roll": None,
-        "throttle": normalize(-1.0),
-        "pitch": None,
-    }
+    from feed_vjoy import NEUTRAL_AXES  # type: ignore
+
+    neutral = (normalize(0.0),) * 4
+    assert NEUTRAL_AXES == neutral
+    last_known = list(neutral)
+
+    # Indexed throttle, roll, pitch, yaw.
+    update = (normalize(-1.0), None, None, normalize(0.25))
 
     filled, missing = _fill_missing_axes(update, last_known, neutral)
 
-    assert filled["yaw"] == normalize(0.25)
-    assert filled["roll"] == neutral["roll"]
-    assert filled["throttle"] == normalize(-1.0)
-    assert filled["pitch"] == neutral["pitch"]
+    assert filled[YAW] == normalize(0.25)
+    assert filled[ROLL] == neutral[ROLL]
+    assert filled[THROTTLE] == normalize(-1.0)
+    assert filled[PITCH] == neutral[PITCH]
     assert missing == ["roll", "pitch"]
     # Ensure last_known was updated for axes with new readings and fallback
-    assert last_known["yaw"] == normalize(0.25)
-    assert last_known["roll"] == neutral["roll"]
+    assert last_known[YAW] == normalize(0.25)
+    assert last_known[ROLL] == neutral[ROLL]
+
+    complete = (1, 2, 3, 4)
+    assert _fill_missing_axes(complete, last_known, neutral) == (complete, [])
+    assert last_known == [1, 2, 3, 4]
 
 
 def test_uinput_mappings() -> None:
@@ -84,3 +114,103 @@ def test_uinput_mappings() -> None:
     assert m01(-0.1) == 0
     assert m01(0.4) == int(0.4 * 65535)
     assert m01(2.0) == 65535
+    assert m11(float("inf")) == 65535 and m11(float("-inf")) == 0
+
+
+def test_decode_command_json_and_binary() -> None:
+    from bci_controller import encode_binary_payload, encode_payload  # type: ignore
+
+    buf = bytearray(2048)
+    for encode in (encode_payload, encode_binary_payload):
+        packet = encode(-0.5, 0.25, 0.75, -1.0, 12.5)
+        assert decode_command(packet) == (0.25, -1.0, 0.75, -0.5)
+        # Receive-buffer views decode the same way.
+        buf[: len(packet)] = packet
+        assert decode_command(memoryview(buf)[: len(packet)]) == (0.25, -1.0, 0.75, -0.5)
+
+    assert decode_command(b'{"speed": 0.75, "rudder": 0.5}') == (0.0, 0.5, 0.0, 0.5)
+    assert decode_command(b"BFS1 truncated") is None
+    assert decode_command(b"not json") is None
+    assert decode_command(b"[1, 2]") is None
+    assert decode_command(encode_binary_payload(float("nan"), 0.0, 0.0, 0.0, 1.0)) is None
+
+
+def test_emit_changed_skips_unchanged_axes() -> None:
+    class _Device:
+        def __init__(self) -> None:
+            self.events: list = []
+
+        def emit(self, code, value, syn=True) -> None:
+            self.events.append((code, value, syn))
+
+        def syn(self) -> None:
+            self.events.append("syn")
+
+    dev = _Device()
+    last = [-1, -1, -1, -1]
+    assert emit_changed(dev, "abcd", (1, 2, 3, 4), last)
+    assert dev.events == [("a", 1, False), ("b", 2, False), ("c", 3, False), ("d", 4, False), "syn"]
+
+    dev.events.clear()
+    assert not emit_changed(dev, "abcd", (1, 2, 3, 4), last)
+    assert dev.events == []
+
+    assert emit_changed(dev, "abcd", (1, 5, 3, 4), last)
+    assert dev.events == [("b", 5, False), "syn"]
+    assert last == [1, 5, 3, 4]
+
+
+def test_raw_joystick_batches_changed_axes_into_one_write() -> None:
+    import os
+
+    from feed_uinput import EV_ABS, EV_SYN, INPUT_EVENT, RawJoystick  # type: ignore
+
+    read_fd, write_fd = os.pipe()
+    joystick = RawJoystick(write_fd, codes=(0, 1, 2, 3))
+    try:
+        last = [-1, -1, -1, -1]
+        assert joystick.write((10, 20, 30, 40), last)
+        assert not joystick.write((10, 20, 30, 40), last)
+        assert joystick.write((10, 25, 30, 40), last)
+
+        data = os.read(read_fd, 4096)
+        events = [event[2:] for event in INPUT_EVENT.iter_unpack(data)]
+        assert events == [
+            (EV_ABS, 0, 10), (EV_ABS, 1, 20), (EV_ABS, 2, 30), (EV_ABS, 3, 40), (EV_SYN, 0, 0),
+            (EV_ABS, 1, 25), (EV_SYN, 0, 0),
+        ]
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+def test_axis_writer_prefers_single_report_update(monkeypatch) -> None:
+    import types
+
+    import feed_vjoy  # type: ignore
+
+    usages = types.SimpleNamespace(HID_USAGE_X=1, HID_USAGE_Y=2, HID_USAGE_Z=3, HID_USAGE_RX=4)
+    monkeypatch.setattr(feed_vjoy, "pyvjoy", usages)
+    axes = (20, 10, 30, 40)  # throttle, roll, pitch, yaw
+
+    class ReportDevice:
+        def __init__(self) -> None:
+            self.data = types.SimpleNamespace(**{name: 0 for name in feed_vjoy._REPORT_FIELDS})
+            self.updates = 0
+
+        def update(self) -> None:
+            self.updates += 1
+
+        def set_axis(self, usage, value) -> None:  # pragma: no cover - must not be used
+            raise AssertionError("set_axis called")
+
+    device = ReportDevice()
+    feed_vjoy._make_axis_writer(device)(axes)
+    assert device.updates == 1
+    assert (device.data.wAxisX, device.data.wAxisY, device.data.wSlider) == (10, 20, 20)
+    assert (device.data.wAxisZ, device.data.wAxisXRot) == (30, 40)
+
+    calls = []
+    legacy = types.SimpleNamespace(set_axis=lambda usage, value: calls.append((usage, value)))
+    feed_vjoy._make_axis_writer(legacy)(axes)
+    assert calls == [(1, 10), (2, 20), (3, 30), (4, 40)]
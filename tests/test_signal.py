@@ -0,0 +1,177 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import signal
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "python"))
+
+from bci_controller import (  # type: ignore
+    BandPowerEstimator,
+    FilterPipeline,
+    IirBandPower,
+    SlidingWindow,
+    WindowedBandPower,
+    _control_step,
+)
+
+
+def test_filter_pipeline_block_matches_rows() -> None:
+    rng = np.random.default_rng(0)
+    block = rng.standard_normal((4, 250))
+    pipeline = FilterPipeline(250.0, 60.0, 1.0, 40.0)
+
+    filtered = pipeline.process(block)
+
+    assert filtered.shape == block.shape
+    for row in range(block.shape[0]):
+        np.testing.assert_allclose(filtered[row], pipeline.process(block[row]), atol=1e-8)
+
+
+def test_band_power_estimator_matches_welch() -> None:
+    rng = np.random.default_rng(1)
+    sig = rng.standard_normal(250)
+    estimator = BandPowerEstimator(250.0, 250)
+
+    freqs, psd = signal.welch(sig, fs=250.0, nperseg=250, window="hann", detrend=False)
+    mask = (freqs >= 8) & (freqs <= 12)
+    expected = float(np.sum(psd[mask]) * (freqs[1] - freqs[0]))
+
+    assert np.isclose(estimator.band(estimator.psd(sig), 8, 12), expected)
+
+
+def test_band_power_estimator_batches_rows() -> None:
+    rng = np.random.default_rng(2)
+    block = rng.standard_normal((4, 1001))
+    estimator = BandPowerEstimator(250.0, 1001)
+
+    powers = estimator.band(estimator.psd(block), 13, 30)
+
+    assert powers.shape == (4,)
+    for row in range(block.shape[0]):
+        assert np.isclose(powers[row], estimator.band(estimator.psd(block[row]), 13, 30))
+
+    psd = estimator.psd(block)
+    stacked = estimator.bands(psd, [(8, 12), (13, 30)])
+    assert stacked.shape == (2, 4)
+    np.testing.assert_allclose(stacked[0], estimator.band(psd, 8, 12), rtol=1e-5)
+    np.testing.assert_allclose(stacked[1], powers, rtol=1e-5)
+
+
+def test_control_step_smooths_clamps_and_applies_dead_band() -> None:
+    mu = np.array([1.0, 3.0, 1.0, 1.0])
+    beta = np.zeros(4)
+    baseline = np.ones(4)
+    state = np.zeros(5)
+    gains = np.array([1.0, 1.0, -1.0, 5.0])
+    out = np.zeros(4)
+
+    _control_step(mu, beta, 0.5, baseline, state, 0.5, gains, 0.05, out)
+    # First hop seeds the EWMA with the raw ratios; gains flip pitch and clamp throttle.
+    assert np.allclose(out, [0.5, 0.0, 1.0, 1.0])
+
+    _control_step(np.ones(4), beta, 1.0, baseline, state, 0.5, gains, 0.3, out)
+    # Yaw decays to 0.25 and falls inside the dead band; throttle 0.25 * 5 is clamped.
+    assert np.allclose(out, [0.0, 0.0, 1.0, 1.0])
+
+
+def test_sliding_window_keeps_latest_samples_in_order() -> None:
+    window = SlidingWindow(2, 5)
+    stream = np.arange(40, dtype=np.float64).reshape(2, 20)
+
+    window.extend(stream[:, :3])
+    assert not window.full
+    for start, stop in ((3, 7), (7, 8), (8, 20)):
+        window.extend(stream[:, start:stop])
+        assert window.full
+        np.testing.assert_array_equal(window.view(), stream[:, stop - 5:stop])
+
+
+def test_filter_pipeline_stream_matches_single_pass() -> None:
+    rng = np.random.default_rng(3)
+    block = 40e-6 + 1e-6 * rng.standard_normal((4, 600))
+
+    whole = FilterPipeline(250.0, 60.0, 1.0, 40.0).stream(block)
+
+    chunked = FilterPipeline(250.0, 60.0, 1.0, 40.0)
+    parts = [chunked.stream(block[:, start:start + 125]) for start in range(0, 600, 125)]
+
+    np.testing.assert_allclose(np.concatenate(parts, axis=1), whole, rtol=1e-9, atol=1e-15)
+
+    reference = FilterPipeline(250.0, 60.0, 1.0, 40.0)
+    sos = reference._sos
+    zi = signal.sosfilt_zi(sos)[:, None, :] * block[None, :, :1].astype(np.float32)
+    expected, _ = signal.sosfilt(sos, block.astype(np.float32), axis=-1, zi=zi.astype(np.float32))
+    np.testing.assert_allclose(whole, expected, rtol=1e-4, atol=1e-9)
+    # Steady-state initialisation keeps the DC offset from ringing through.
+    assert np.max(np.abs(whole)) < 1e-5
+
+
+def test_band_power_worker_publishes_latest_features() -> None:
+    import queue
+
+    from bci_controller import BandPowerWorker, MockBoard, RowGather  # type: ignore
+
+    fs, n = 250.0, 125
+    board = MockBoard(fs, ["C3", "C4", "Cz", "Oz"])
+    board.start_stream()
+    out: "queue.Queue" = queue.Queue(maxsize=2)
+    worker = BandPowerWorker(
+        board,
+        RowGather(range(4)),
+        FilterPipeline(fs, 60.0, 1.0, 40.0),
+        WindowedBandPower(fs, n, ((8, 12), (13, 30), (8, 12))),
+        0.05,
+        out,
+        hop_samples=int(0.05 * fs),
+    )
+    worker.start()
+    try:
+        deadline, mu, beta, oz_alpha = out.get(timeout=5)
+    finally:
+        worker.stop()
+        worker.join(timeout=2)
+
+    assert not worker.is_alive()
+    assert deadline <= time.monotonic()
+    assert mu.shape == (4,) and beta.shape == (4,)
+    assert isinstance(oz_alpha, float) and oz_alpha > 0
+
+
+def test_iir_band_power_tracks_windowed_estimate() -> None:
+    fs = 250.0
+    bands = ((8, 12), (13, 30), (8, 12))
+    t = np.arange(int(6 * fs)) / fs
+    # 10 Hz (mu/alpha) amplitude 2 and 20 Hz (beta) amplitude 1 on every channel.
+    block = (2.0 * np.sin(2 * np.pi * 10 * t) + np.sin(2 * np.pi * 20 * t)).astype(np.float32)
+    block = np.tile(block, (4, 1))
+
+    iir = IirBandPower(fs, 4, bands, tau=1.0)
+    windowed = WindowedBandPower(fs, int(fs), bands)
+    for start in range(0, block.shape[1], 50):
+        iir_result = iir.update(block[:, start:start + 50])
+        fft_result = windowed.update(block[:, start:start + 50])
+
+    mu, beta, oz_alpha = iir_result
+    # A sinusoid of amplitude A carries A**2 / 2 of power.
+    np.testing.assert_allclose(mu, 2.0, rtol=0.1)
+    np.testing.assert_allclose(beta, 0.5, rtol=0.1)
+    assert oz_alpha == mu[3]
+    np.testing.assert_allclose(mu, fft_result[0], rtol=0.1)
+    np.testing.assert_allclose(beta, fft_result[1], rtol=0.1)
+
+
+def test_row_gather_reuses_contiguous_buffer() -> None:
+    from bci_controller import RowGather  # type: ignore
+
+    data = np.arange(80, dtype=np.float64).reshape(8, 10)
+    gather = RowGather([3, 1, 6, 0], capacity=4)
+
+    first = gather(data[:, :4])
+    np.testing.assert_array_equal(first, data[[3, 1, 6, 0], :4])
+    assert first.dtype == np.float32 and first.flags["C_CONTIGUOUS"]
+    # Larger blocks grow the buffer; smaller ones reuse it.
+    np.testing.assert_array_equal(gather(data), data[[3, 1, 6, 0]])
+    assert np.shares_memory(gather(data[:, :2]), gather(data[:, :3]))